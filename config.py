@@ -5,6 +5,7 @@ __email__ = "damian.giebas@gmail.com"
 __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
+from os.path import expanduser, join
 import platform
 
 compiler_cmd = "gcc"
@@ -24,3 +25,5 @@ relations: dict = {  # Names of functions between which there are sequential rel
 PTHREAD_MUTEX_DEFAULT_VAL = "PTHREAD_MUTEX_NORMAL"
 OS = platform.system()
 
+cache_dir = join(expanduser("~"), ".cache", "rdao_detector")  # Directory with cached artifacts of analysis
+cache_max_size = 512 * 2 ** 20  # Maximal size of single cache in bytes
@@ -11,4 +11,4 @@ from helpers.edge_type import EdgeType
 from helpers.functions import *
 from helpers.lock_helper import lock_types_str, lock_strings
 from helpers.lock_type import LockType
-from helpers.time_unit_helper import get_time_unit_edges, get_time_units_graphs
+from helpers.time_unit_helper import EdgeIndex, get_edge_index, get_time_unit_edges, get_time_units_graphs
@@ -0,0 +1,171 @@
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+import config as c
+from collections import Counter, defaultdict
+from hashlib import sha256
+import logging
+from os import listdir, makedirs, remove, replace, stat, utime
+from os.path import isdir, join
+import pickle
+from tempfile import NamedTemporaryFile
+from threading import Lock
+from time import time_ns
+from typing import Any, Callable, Optional
+
+cache_statistics = defaultdict(Counter)  # Number of hits and misses for every cache namespace
+
+
+class Cache:
+    """ Size-bounded on-disk cache with least recently used eviction policy """
+    __entry_extension = ".entry"
+
+    def __init__(self, directory: str, namespace: str, max_size: int = c.cache_max_size):
+        """ Ctor
+        :param directory: Path to directory with all caches
+        :param namespace: Name of subdirectory used by this cache
+        :param max_size: Maximal size of cache in bytes
+        """
+        self.__namespace = namespace
+        self.__directory = join(directory, namespace)
+        self.__max_size = max_size
+        self.__size = None
+        self.__last_access = 0
+        self.__lock = Lock()
+        makedirs(self.__directory, exist_ok=True)
+
+    @property
+    def namespace(self) -> str:
+        """ Name of cache """
+        return self.__namespace
+
+    @property
+    def directory(self) -> str:
+        """ Path to directory with cache entries """
+        return self.__directory
+
+    @staticmethod
+    def key(*parts) -> str:
+        """ Method build key from given parts
+        :param parts: Bytes or objects which are converted to string
+        :return: Hex digest
+        """
+        digest = sha256()
+        for part in parts:
+            if not isinstance(part, bytes):
+                part = str(part).encode()
+            digest.update(len(part).to_bytes(8, "little"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def __entry_path(self, key: str) -> str:
+        """ Method return path to entry file for given key """
+        return join(self.__directory, f"{key}{self.__entry_extension}")
+
+    def get(self, key: str, validator: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """ Method return object stored under given key and mark entry as recently used
+        :param key: Entry key
+        :param validator: Optional function which checks that stored object is still valid
+        :return: Stored object or None if there is no valid entry
+        """
+        path = self.__entry_path(key)
+        value = None
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as ex:
+            logging.warning(f"Cannot read cache entry {path}: {ex}")
+        if (value is not None) and (validator is not None) and not validator(value):
+            value = None
+
+        with self.__lock:
+            cache_statistics[self.__namespace]["misses" if value is None else "hits"] += 1
+        if value is not None:
+            self.__touch(path)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """ Method store object under given key, and evict least recently used entries if cache is too big
+        :param key: Entry key
+        :param value: Object to store
+        """
+        path = self.__entry_path(key)
+        try:
+            f = NamedTemporaryFile(dir=self.__directory, suffix=".tmp", delete=False)
+        except OSError as ex:
+            logging.warning(f"Cannot write cache entry {path}: {ex}")
+            return
+        try:
+            with f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            try:
+                replaced_size = stat(path).st_size  # Size of overwritten entry is not counted any more
+            except FileNotFoundError:
+                replaced_size = 0
+            replace(f.name, path)
+            self.__touch(path)
+            size = stat(path).st_size
+        except (OSError, pickle.PicklingError, RecursionError) as ex:
+            logging.warning(f"Cannot write cache entry {path}: {ex}")
+            try:
+                remove(f.name)
+            except FileNotFoundError:
+                pass
+            return
+
+        with self.__lock:
+            if self.__size is None:
+                self.__size = sum(size for _, size, _ in self.__entries())
+            else:
+                self.__size += size - replaced_size
+            if self.__size > self.__max_size:
+                self.__evict()
+
+    def __touch(self, path: str) -> None:
+        """ Method mark entry as recently used
+        Modification time is strictly increasing, so the order of accesses is kept even on file systems with coarse
+        timestamps.
+
+        :param path: Path to entry
+        """
+        with self.__lock:
+            self.__last_access = max(time_ns(), self.__last_access + 1)
+            access_time = self.__last_access
+        try:
+            utime(path, ns=(access_time, access_time))
+        except OSError as ex:
+            logging.debug(f"Cannot mark cache entry {path} as used: {ex}")
+
+    def __entries(self) -> list:
+        """ Method return list with modification time, size and path of every entry """
+        entries = list()
+        if not isdir(self.__directory):
+            return entries
+        for name in listdir(self.__directory):
+            if not name.endswith(self.__entry_extension):
+                continue
+            path = join(self.__directory, name)
+            try:
+                st = stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        return entries
+
+    def __evict(self) -> None:
+        """ Method remove least recently used entries until size of cache is lower than limit """
+        entries = sorted(self.__entries())
+        self.__size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if self.__size <= self.__max_size:
+                break
+            try:
+                remove(path)
+            except FileNotFoundError:
+                pass
+            self.__size -= size
+            logging.debug(f"Cache entry evicted: {path}")
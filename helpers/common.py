@@ -3,7 +3,9 @@ __email__ = "damian.giebas@gmail.com"
 __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
+from argparse import ArgumentTypeError
 from contextlib import contextmanager
+from helpers.cache import cache_statistics
 
 import time
 import tracemalloc
@@ -24,6 +26,8 @@ def resource_usage(doit):
         print("\tCurrent memory usage is {:.2f}MB".format(current / 10 ** 6))
         print("\tPeak was {:.2f}MB".format(peak / 10 ** 6))
         print("\tTime: {:.2f}s".format(end - start))
+        for namespace, statistics in sorted(cache_statistics.items()):
+            print("\tCache of {}: {} hits, {} misses".format(namespace, statistics["hits"], statistics["misses"]))
     else:
         yield
 
@@ -44,4 +48,15 @@ def functions_pair(arg) -> tuple:
             result.append(safe_replaces[pair])
         else:
             result.append(pair)
-    return tuple(result)
\ No newline at end of file
+    return tuple(result)
+
+
+def positive_int(arg) -> int:
+    """ Function convert argument to integer greater than zero """
+    try:
+        value = int(arg)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid int value: '{arg}'")
+    if value < 1:
+        raise ArgumentTypeError(f"value has to be greater than zero: '{arg}'")
+    return value
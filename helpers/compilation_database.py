@@ -0,0 +1,96 @@
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from collections import namedtuple
+import json
+import logging
+from os.path import abspath, isabs, join, normpath
+from pathlib import Path
+import shlex
+import sys
+from typing import Optional
+
+CompileCommand = namedtuple("CompileCommand", ["file", "flags"])
+
+__path_options = ("-I", "-isystem", "-iquote", "-idirafter", "-include", "-imacros")
+__value_options = ("-D", "-U") + __path_options
+
+
+def _absolute(path: str, directory: str) -> str:
+    """ Function return absolute path, relative paths are resolved against compilation directory
+    :param path: Path from compilation command
+    :param directory: Compilation directory
+    :return: String with absolute path
+    """
+    return normpath(path if isabs(path) else join(directory, path))
+
+
+def _preprocessor_flags(arguments: list, directory: str) -> list:
+    """ Function select flags which have influence on preprocessor output
+    Paths given in selected flags are converted to absolute paths.
+
+    :param arguments: Compilation command split into arguments
+    :param directory: Compilation directory
+    :return: List with flags
+    """
+    flags = list()
+    arguments = iter(arguments[1:])
+    for argument in arguments:
+        if argument in __value_options:
+            value = next(arguments, None)
+            if value is None:
+                break
+            if argument in __path_options:
+                value = _absolute(value, directory)
+            flags.extend([argument, value])
+            continue
+        for option in __value_options:
+            if argument.startswith(option) and len(argument) > len(option):
+                value = argument[len(option):]
+                if option in __path_options:
+                    value = _absolute(value, directory)
+                flags.append(f"{option}{value}")
+                break
+        else:
+            if argument.startswith("-std=") or argument in ("-ansi", "-nostdinc", "-undef", "-pthread"):
+                flags.append(argument)
+    return flags
+
+
+def load_compile_commands(path: str, root: Optional[str] = None, header_extensions: tuple = ("h",)) -> list:
+    """ Function read compilation database in compile_commands.json format
+    Only the first entry of every translation unit is taken into account.
+
+    :param path: Path to compile_commands.json file
+    :param root: If given, only files placed in this path are returned
+    :param header_extensions: Header files extensions, entries for headers are skipped
+    :return: List with CompileCommand objects
+    """
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+    except (OSError, ValueError) as ex:
+        logging.critical(f"Cannot read compilation database {path}: {ex}")
+        logging.critical("Terminating application")
+        sys.exit(1)
+
+    root = Path(abspath(root)) if root is not None else None
+    commands = list()
+    files = set()
+    for entry in entries:
+        if ("file" not in entry) or not ({"arguments", "command"} & entry.keys()):
+            logging.warning(f"Incomplete entry of compilation database skipped: {entry}")
+            continue
+        directory = abspath(entry.get("directory", "."))
+        file = _absolute(entry["file"], directory)
+        *_, extension = file.split(".")
+        if (file in files) or (extension in header_extensions):
+            continue
+        if (root is not None) and (root != Path(file)) and (root not in Path(file).parents):
+            continue
+        arguments = entry["arguments"] if "arguments" in entry else shlex.split(entry["command"])
+        files.add(file)
+        commands.append(CompileCommand(file, _preprocessor_flags(arguments, directory)))
+    return commands
@@ -0,0 +1,172 @@
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from helpers.cache import Cache
+from importlib import import_module
+import logging
+from os import makedirs
+from pickle import PicklingError
+import pycparser
+from pycparser.c_ast import FileAST
+from pycparser.ply.yacc import __tabversion__
+import sys
+from typing import Iterable, Optional
+
+__parser = None
+__tables_dir = None
+__lextab = "pycparser_lextab"
+__yacctab = "pycparser_yacctab"
+
+
+def _package_tables_available() -> bool:
+    """ Function check that lexer and parser tables distributed with pycparser can be used
+    :return: Boolean value
+    """
+    try:
+        return all(
+            import_module(f"pycparser.{module}")._tabversion == __tabversion__ for module in ("lextab", "yacctab")
+        )
+    except (ImportError, AttributeError):
+        return False
+
+
+def get_parser(tables_dir: Optional[str] = None) -> pycparser.CParser:
+    """ Function return parser which is reused for every translation unit in process
+    If tables distributed with pycparser cannot be used, lexer and parser tables are generated once and stored in
+    given directory, so next runs do not have to generate them again.
+
+    :param tables_dir: Writable directory for generated lexer and parser tables
+    :return: CParser object
+    """
+    global __parser, __tables_dir
+    if __parser is not None:
+        return __parser
+    __tables_dir = tables_dir
+    if (tables_dir is None) or _package_tables_available():
+        __parser = pycparser.CParser()
+        return __parser
+
+    try:
+        makedirs(tables_dir, exist_ok=True)
+    except OSError as ex:
+        logging.warning(f"Cannot create directory for parser tables {tables_dir}: {ex}")
+        __parser = pycparser.CParser()
+        return __parser
+    if tables_dir not in sys.path:
+        sys.path.append(tables_dir)
+    __parser = pycparser.CParser(lextab=__lextab, yacctab=__yacctab, taboutputdir=tables_dir)
+    return __parser
+
+
+def _cache_key(text: str, filename: str) -> str:
+    """ Function return key of AST in cache
+    :param text: Purified C code
+    :param filename: Name of parsed file
+    :return: Cache key
+    """
+    return Cache.key(text, filename, pycparser.__version__)
+
+
+def parse_text(text: str, filename: str, cache: Optional[Cache] = None) -> FileAST:
+    """ Function parse purified C code
+    If cache is given, AST is taken from it when code was already parsed by this version of pycparser.
+
+    :param text: Purified C code
+    :param filename: Name of file used in coordinates of nodes
+    :param cache: Cache with parsed AST's
+    :return: FileAST object
+    """
+    key = None
+    if cache is not None:
+        key = _cache_key(text, filename)
+        ast = cache.get(key)
+        if ast is not None:
+            logging.debug(f"AST taken from cache: {filename}")
+            return ast
+
+    ast = get_parser().parse(text, filename)
+    if cache is not None:
+        cache.put(key, ast)
+    return ast
+
+
+def parse_pure_file(path: str, cache: Optional[Cache] = None) -> FileAST:
+    """ Function parse purified C file
+    :param path: Path to pured C file
+    :param cache: Cache with parsed AST's
+    :return: FileAST object
+    """
+    with open(path) as f:
+        return parse_text(f.read(), path, cache)
+
+
+def _parse_source(source: tuple) -> FileAST:
+    """ Function parse single translation unit in worker process
+    :param source: Pair of file name and purified C code
+    :return: FileAST object
+    """
+    filename, text = source
+    return parse_text(text, filename)
+
+
+def _parsed_source(future: Future, source: tuple) -> FileAST:
+    """ Function return AST parsed by worker process
+    AST which is too deep to be sent back from worker process is parsed again in this process.
+
+    :param future: Future object with result of parsing in worker process
+    :param source: Pair of file name and purified C code
+    :return: FileAST object
+    """
+    try:
+        return future.result()
+    except (RecursionError, PicklingError) as ex:
+        logging.warning(f"AST of {source[0]} cannot be sent from worker process, file is parsed sequentially: {ex}")
+        return _parse_source(source)
+
+
+def parse_texts(sources: Iterable[tuple], jobs: int = 1, cache: Optional[Cache] = None) -> deque:
+    """ Function parse set of translation units
+    Translation units missing in cache are parsed by pool of processes, but order of results is the same as order of
+    sources. Parsing is serial if there is only one unit to parse or pool of processes cannot be used, and unit whose
+    AST cannot be sent back from worker process is parsed again serially.
+
+    :param sources: Pairs of file name and purified C code
+    :param jobs: Maximal number of processes parsing code at the same time
+    :param cache: Cache with parsed AST's
+    :return: deque object with FileAST objects
+    """
+    sources = list(sources)
+    ast = [None] * len(sources)
+    keys = [None] * len(sources)
+    missing = list()
+    for i, (filename, text) in enumerate(sources):
+        if cache is not None:
+            keys[i] = _cache_key(text, filename)
+            ast[i] = cache.get(keys[i])
+        if ast[i] is None:
+            missing.append(i)
+        else:
+            logging.debug(f"AST taken from cache: {filename}")
+
+    parsed = None
+    if jobs > 1 and len(missing) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(missing)), initializer=get_parser,
+                                     initargs=(__tables_dir,)) as executor:
+                futures = [executor.submit(_parse_source, sources[i]) for i in missing]
+                parsed = [_parsed_source(future, sources[i]) for future, i in zip(futures, missing)]
+        except (BrokenProcessPool, OSError) as ex:
+            logging.warning(f"Parallel parsing is not possible, files are parsed sequentially: {ex}")
+    if parsed is None:
+        parsed = [_parse_source(sources[i]) for i in missing]
+
+    for i, tree in zip(missing, parsed):
+        ast[i] = tree
+        if cache is not None:
+            cache.put(keys[i], tree)
+    return deque(ast)
@@ -6,67 +6,297 @@ __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import config as c
 from contextlib import contextmanager
+from functools import lru_cache
+from hashlib import sha256
+from helpers.cache import Cache
+from helpers.compilation_database import CompileCommand
 from helpers.path import get_project_path
 import logging
-from os import remove
-from os.path import exists, isfile, join
+from os import remove, stat
+from os.path import abspath, exists, isfile, join
 from pathlib import Path
+import re
+import shlex
 from subprocess import Popen, PIPE
 import sys
-from typing import Iterable
+from typing import Iterable, Optional, Union
 
+__line_marker_exp = re.compile(rb'^# \d+ "((?:[^"\\]|\\.)*)"', re.MULTILINE)
+
+
+def _preprocess(path: str, cflags: str = "", headers: Iterable[str] = tuple(), cache: Optional[Cache] = None) -> tuple:
+    """ Function run C preprocessor for given file
+    If cache is given, preprocessor is not run for file whose source, command and included files did not change.
 
-def purify_file(path: str, cflags: str = "", headers: Iterable[str] = tuple()) -> str:
-    """ Function purify C file
     :param path: Path to C file
     :param cflags: C compiler flags needed to compilation
     :param headers: Sequence with paths to headers
-    :return:  Path to pured C file
+    :param cache: Cache with purified files
+    :return: Tuple with preprocessor output, errors output and return code
     """
     if not exists(path):
         raise FileNotFoundError(f"Given path does not exists: '{path}'")
     if not isfile(path):
         raise IsADirectoryError(f"Given path is not a file: '{path}'")
     dir_path = get_project_path()
-    output_file: str = f"{path}.pure"
     command: list = [c.compiler_cmd, "-Wall", "-I", join(dir_path, "utils/fake_libc_include"), cflags]
     if headers:
         for header_path in headers:
             command.extend(["-I", header_path])
     command.extend(["-E", path])
-    o, e = Popen(' '.join(command), stdout=PIPE, stderr=PIPE, shell=True).communicate()
-    if e:
+    command_line = ' '.join(command)
+
+    key = None
+    if cache is not None:
+        with open(path, "rb") as f:
+            key = cache.key(f.read(), command_line, _compiler_version())
+        entry = cache.get(key, lambda value: _dependencies_unchanged(value["dependencies"]))
+        if entry is not None:
+            logging.debug(f"Purified file taken from cache: {path}")
+            return entry["output"], entry["errors"], 0
+
+    process = Popen(command_line, stdout=PIPE, stderr=PIPE, shell=True)
+    o, e = process.communicate()
+    if (cache is not None) and not process.returncode:
+        cache.put(key, {"dependencies": _collect_dependencies(o), "output": o, "errors": e})
+    return o, e, process.returncode
+
+
+@lru_cache(maxsize=None)
+def _compiler_version() -> bytes:
+    """ Function return version of used compiler, because purified code depends on it
+    :return: Output of compiler
+    """
+    o, _ = Popen(f"{c.compiler_cmd} --version", stdout=PIPE, stderr=PIPE, shell=True).communicate()
+    return o
+
+
+def _file_digest(path: str) -> str:
+    """ Function return hash of file content
+    :param path: Path to file
+    :return: Hex digest
+    """
+    with open(path, "rb") as f:
+        return sha256(f.read()).hexdigest()
+
+
+def _collect_dependencies(output: bytes) -> dict:
+    """ Function collect all files which was included by preprocessor
+    :param output: Preprocessor output with line markers
+    :return: Dict with path to file as key and tuple with modification time, size and hash of file
+    """
+    dependencies = dict()
+    for match in __line_marker_exp.finditer(output):
+        name = match.group(1).decode(errors="replace")
+        if name.startswith("<") or name in dependencies:  # <built-in>, <command-line>
+            continue
+        path = abspath(name)
+        if path in dependencies:
+            continue
+        try:
+            st = stat(path)
+            dependencies[path] = (st.st_mtime_ns, st.st_size, _file_digest(path))
+        except OSError:
+            logging.debug(f"Cannot stat included file: {path}")
+    return dependencies
+
+
+def _dependencies_unchanged(dependencies: dict) -> bool:
+    """ Function check that files included by preprocessor are unchanged
+    :param dependencies: Dict created by _collect_dependencies function
+    :return: Boolean value
+    """
+    for path, (mtime, size, digest) in dependencies.items():
+        try:
+            st = stat(path)
+            if (st.st_mtime_ns, st.st_size) == (mtime, size):
+                continue
+            if (st.st_size != size) or (_file_digest(path) != digest):
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def write_pure_file(path: str, content: Union[bytes, str]) -> str:
+    """ Function save purified content next to the source file
+    :param path: Path to C file
+    :param content: Purified content
+    :return: Path to pured C file
+    """
+    output_file: str = f"{path}.pure"
+    with open(output_file, "wb" if isinstance(content, bytes) else "w") as f:
+        f.write(content)
+    return output_file
+
+
+def _decode(content: bytes) -> str:
+    """ Function convert preprocessor output to text in the same way as reading of pure file does
+    :param content: Preprocessor output
+    :return: Purified code
+    """
+    return content.decode(errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _purify(path: str, cflags: str, headers: Iterable[str], cache: Optional[Cache]) -> bytes:
+    """ Function purify C file and terminate application if it is not possible
+    :param path: Path to C file
+    :param cflags: C compiler flags needed to compilation
+    :param headers: Sequence with paths to headers
+    :param cache: Cache with purified files
+    :return: Purified content
+    """
+    o, e, return_code = _preprocess(path, cflags, headers, cache)
+    if return_code:
         logging.critical(f"Critical error during purifizing file: {path}")
         logging.critical(e)
         logging.critical("Terminating application")
         sys.exit(1)
-    with open(output_file, "wb") as f:
-        f.write(o)
-    return output_file
+    if e:
+        logging.warning(f"Preprocessor reported problems for file: {path}")
+        logging.warning(e)
+    return o
 
 
-def purify_files(paths: Iterable[str], cflags: str = "", header_extensions: tuple = ("h",)) -> deque:
-    """ Purify set of files
+def _translation_units(paths: Iterable[str], cflags: str, header_extensions: tuple) -> list:
+    """ Function prepare purification of project files
+    Directory of every header file is passed to preprocessor of every source file.
 
     :param paths: Paths to C files
     :param cflags: C compiler flags needed to compilation
     :param header_extensions: Header files extensions
-    :return:  Paths to pured C files
+    :return: List with path to C file, compiler flags and headers directories for every source file
     """
     headers_dirs = set()
     source_files = list()
-    pure_files = deque()
     for file in paths:
         *_, extension = str(file).split(".")
         if extension in header_extensions:
             headers_dirs.add(str(Path(file).absolute().parent))
         else:
             source_files.append(str(Path(file).absolute()))
-    for file in source_files:
-        pure_files.append(purify_file(file, cflags, headers_dirs))
-    return pure_files
+
+    headers_dirs = sorted(headers_dirs)  # Stable order of -I options gives stable preprocessor output
+    return [(file, cflags, headers_dirs) for file in source_files]
+
+
+def _database_units(commands: Iterable[CompileCommand], cflags: str) -> list:
+    """ Function prepare purification of files from compilation database
+    :param commands: CompileCommand objects
+    :param cflags: C compiler flags added to flags of every file
+    :return: List with path to C file, compiler flags and headers directories for every source file
+    """
+    units = list()
+    for command in commands:
+        flags = " ".join(shlex.quote(flag) for flag in command.flags)
+        units.append((command.file, f"{flags} {cflags}".strip(), tuple()))
+    return units
+
+
+def _purify_many(units: list, jobs: int, cache: Optional[Cache]) -> list:
+    """ Function purify set of files using pool of workers
+    If preprocessing of some files fails, all failures are reported before application is terminated.
+
+    :param units: List with path to C file, compiler flags and headers directories for every source file
+    :param jobs: Maximal number of preprocessor processes working at the same time
+    :param cache: Cache with purified files
+    :return: List with pairs of path to C file and purified content, in order of given units
+    """
+    purified = list()
+    failures = list()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        results = executor.map(lambda unit: _preprocess(*unit, cache), units)
+        for (file, *_), (o, e, return_code) in zip(units, results):
+            if return_code:
+                failures.append((file, e))
+                continue
+            if e:
+                logging.warning(f"Preprocessor reported problems for file: {file}")
+                logging.warning(e)
+            purified.append((file, o))
+
+    if failures:
+        for file, e in failures:
+            logging.critical(f"Critical error during purifizing file: {file}")
+            logging.critical(e)
+        logging.critical(f"Purifizing failed for {len(failures)} of {len(units)} files")
+        logging.critical("Terminating application")
+        sys.exit(1)
+    return purified
+
+
+def preprocess_file(path: str, cflags: str = "", headers: Iterable[str] = tuple(),
+                    cache: Optional[Cache] = None) -> str:
+    """ Function purify C file without saving result on disk
+    :param path: Path to C file
+    :param cflags: C compiler flags needed to compilation
+    :param headers: Sequence with paths to headers
+    :param cache: Cache with purified files
+    :return: Purified code
+    """
+    return _decode(_purify(path, cflags, headers, cache))
+
+
+def preprocess_files(paths: Iterable[str], cflags: str = "", header_extensions: tuple = ("h",), jobs: int = 1,
+                     cache: Optional[Cache] = None) -> deque:
+    """ Purify set of files without saving results on disk
+    Files are preprocessed concurrently by pool of workers, but order of results is the same as order of paths.
+
+    :param paths: Paths to C files
+    :param cflags: C compiler flags needed to compilation
+    :param header_extensions: Header files extensions
+    :param jobs: Maximal number of preprocessor processes working at the same time
+    :param cache: Cache with purified files
+    :return: Pairs of path to C file and purified code
+    """
+    units = _translation_units(paths, cflags, header_extensions)
+    return deque((file, _decode(o)) for file, o in _purify_many(units, jobs, cache))
+
+
+def preprocess_compile_commands(commands: Iterable[CompileCommand], cflags: str = "", jobs: int = 1,
+                                cache: Optional[Cache] = None) -> deque:
+    """ Purify files from compilation database without saving results on disk
+    Every file is preprocessed with its own flags and include paths. Files are preprocessed concurrently by pool of
+    workers, but order of results is the same as order of commands.
+
+    :param commands: CompileCommand objects
+    :param cflags: C compiler flags added to flags of every file
+    :param jobs: Maximal number of preprocessor processes working at the same time
+    :param cache: Cache with purified files
+    :return: Pairs of path to C file and purified code
+    """
+    units = _database_units(commands, cflags)
+    return deque((file, _decode(o)) for file, o in _purify_many(units, jobs, cache))
+
+
+def purify_file(path: str, cflags: str = "", headers: Iterable[str] = tuple(), cache: Optional[Cache] = None) -> str:
+    """ Function purify C file
+    :param path: Path to C file
+    :param cflags: C compiler flags needed to compilation
+    :param headers: Sequence with paths to headers
+    :param cache: Cache with purified files
+    :return:  Path to pured C file
+    """
+    return write_pure_file(path, _purify(path, cflags, headers, cache))
+
+
+def purify_files(paths: Iterable[str], cflags: str = "", header_extensions: tuple = ("h",), jobs: int = 1,
+                 cache: Optional[Cache] = None) -> deque:
+    """ Purify set of files
+    Files are preprocessed concurrently by pool of workers, but order of results is the same as order of paths.
+
+    :param paths: Paths to C files
+    :param cflags: C compiler flags needed to compilation
+    :param header_extensions: Header files extensions
+    :param jobs: Maximal number of preprocessor processes working at the same time
+    :param cache: Cache with purified files
+    :return:  Paths to pured C files
+    """
+    units = _translation_units(paths, cflags, header_extensions)
+    return deque(write_pure_file(file, o) for file, o in _purify_many(units, jobs, cache))
 
 
 @contextmanager
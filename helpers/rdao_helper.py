@@ -5,12 +5,21 @@ __email__ = "damian.giebas@gmail.com"
 __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
+from helpers.edge_type import EdgeType
 from helpers.exceptions import RDAOException
 from mascm.edge import Edge
+from mascm.edge_list import EdgeList
 from mascm.operation import Operation
 from mascm.resource import Resource
 
 
+def get_edges_of_kind(edges: list, kind: EdgeType) -> list:
+    """ Function return edges of given kind, in order in which they are placed in given edges """
+    if isinstance(edges, EdgeList):
+        return edges.of_kind(kind)
+    return [edge for edge in edges if edge.kind == kind]
+
+
 def get_operation_from_edge(edge: Edge) -> Operation:
     """ Function get first found operation in edge """
     if isinstance(edge.first, Operation):
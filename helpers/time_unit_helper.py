@@ -7,10 +7,9 @@ __version__ = "1.1"
 
 from collections import defaultdict
 import config as c
-from helpers import expressions as e
+from helpers.edge_type import EdgeType
 import logging
 from mascm import Operation, TimeUnit
-import re
 from types import coroutine
 
 
@@ -31,24 +30,105 @@ def get_time_unit_edges(time_unit: TimeUnit, edges: list) -> coroutine:
                 logging.debug(f"Skipping edge: {edge}")
 
 
+class EdgeIndex:
+    """ Index of edges by threads, which allow build graphs of time units with one pass through edges """
+
+    def __init__(self, edges: list):
+        """ Ctor
+        :param edges: List of all edges
+        """
+        self.__edges = edges
+        self.__version = getattr(edges, "version", None)
+        self.__thread_edges = defaultdict(list)  # Thread index -> edges with operation of the thread
+        for edge in edges:
+            threads = set()
+            if isinstance(edge.first, Operation):
+                threads.add(edge.first.thread.index)
+            if isinstance(edge.second, Operation):
+                threads.add(edge.second.thread.index)
+            for thread_index in threads:
+                self.__thread_edges[thread_index].append(edge)
+        self.__thread_graphs = dict()  # Thread index and mutex state -> graph edges and mutex state after them
+
+    def is_valid_for(self, edges: list) -> bool:
+        """ Method check index was built for given edges and they were not modified since then
+        :param edges: List of all edges
+        :return: Boolean value
+        """
+        return (edges is self.__edges) and (self.__version is not None) and (self.__version == edges.version)
+
+    def thread_edges(self, thread) -> list:
+        """ Method return edges with operation of given thread
+        :param thread: Thread object
+        :return: List with edges, in order of all edges
+        """
+        return self.__thread_edges.get(thread.index, [])
+
+    @staticmethod
+    def is_edge_of_thread(edge, thread) -> bool:
+        """ Method check edge has operation of given thread
+        :param edge: Edge object
+        :param thread: Thread object
+        :return: Boolean value
+        """
+        return (isinstance(edge.first, Operation) and (edge.first.thread.index == thread.index)) or \
+            (isinstance(edge.second, Operation) and (edge.second.thread.index == thread.index))
+
+    def __thread_graph(self, thread, is_mutex: bool) -> tuple:
+        """ Method select edges of thread which belong to graph of time unit
+        Edges with mutex or resource are always selected, other edges are selected only between mutex edges.
+
+        :param thread: Thread object
+        :param is_mutex: True if odd number of mutex edges was found before edges of thread
+        :return: Tuple with list of selected edges and mutex state after them
+        """
+        key = (thread.index, is_mutex)
+        if key not in self.__thread_graphs:
+            graph = list()
+            for edge in self.thread_edges(thread):
+                if edge.kind in (EdgeType.locking, EdgeType.unlocking):
+                    graph.append(edge)
+                    is_mutex = not is_mutex
+                elif edge.kind in (EdgeType.usage, EdgeType.dependency):
+                    graph.append(edge)
+                elif is_mutex:
+                    graph.append(edge)
+                else:
+                    logging.debug(f"Skipping edge: {edge}")
+            self.__thread_graphs[key] = (graph, is_mutex)
+        return self.__thread_graphs[key]
+
+    def time_units_graphs(self, time_units: list) -> defaultdict:
+        """ Method return dict with graphs for given time units
+        :param time_units: List of time units
+        :return: Collection of edges which build graphs for given time units
+        """
+        graphs = defaultdict(list)
+        is_mutex = False
+        for unit in time_units:
+            key = str(unit)
+            for thread in unit:
+                graph, is_mutex = self.__thread_graph(thread, is_mutex)
+                graphs[key].extend(graph)
+        return graphs
+
+
+def get_edge_index(mascm) -> EdgeIndex:
+    """ Function return index of model edges, index is built again only if edges were modified
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :return: EdgeIndex object
+    """
+    index = mascm.edge_index
+    if (index is None) or not index.is_valid_for(mascm.edges):
+        index = EdgeIndex(mascm.edges)
+        mascm.edge_index = index
+    return index
+
+
 def get_time_units_graphs(time_units: list, edges: list) -> defaultdict:
     """ Function return dict with graphs for given time units
     :param time_units: List of time units
     :param edges: List of all edges
     :return: Collection of edges which build graphs for given time units
     """
-    graphs = defaultdict(list)
-    is_mutex = False
-    for unit in time_units:
-        key = str(unit)
-        for edge in get_time_unit_edges(unit, edges):
-            if re.match(e.mutex_exp, str(edge.first)) or re.match(e.mutex_exp, str(edge.second)):
-                graphs[key].append(edge)
-                is_mutex = not is_mutex
-            elif re.match(e.resource_exp, str(edge.first)) or re.match(e.resource_exp, str(edge.second)):
-                graphs[key].append(edge)
-            elif is_mutex:
-                graphs[key].append(edge)
-            else:
-                logging.debug(f"Skipping edge: {edge}")
-    return graphs
+    return EdgeIndex(edges).time_units_graphs(time_units)
@@ -5,6 +5,7 @@ __version__ = "1.1"
 
 from mascm.create_mascm import create_mascm
 from mascm.edge import Edge
+from mascm.edge_list import EdgeList
 from mascm.lock import Lock
 from mascm.mascm import MultithreadedApplicationSourceCodeModel
 from mascm.operation import Operation
@@ -0,0 +1,52 @@
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from collections import deque
+from mascm.lock import Lock
+from mascm.resource import Resource
+from mascm.symbol_table import SymbolTable
+
+
+class BuildContext:
+    """Class is container of state used during creation of single MASCM object"""
+    __slots__ = ('is_loop_body', 'function_call_stack', 'recursion_function', 'threads_stack', 'expected_definitions',
+                 'forward_operations_handler', 'backward_operations_handler', 'symmetric_operations_handler',
+                 'relations', 'function_summaries', 'called_functions', 'recursion_cutoffs', 'resources_table',
+                 'local_resources_table', 'mutexes_table', 'operation_positions', 'relation_index', 'relation_sequence',
+                 'related_operations')
+
+    def __init__(self, relations: dict):
+        """ Ctor
+        :param relations: Dict with sets of function pairs for every kind of relation, used during whole creation
+        """
+        self.is_loop_body = []  # List which contains only True values to know about nesting loops
+        self.function_call_stack = deque()
+        self.recursion_function = set()
+        self.threads_stack = list()
+        self.expected_definitions = list()
+        self.forward_operations_handler = dict()  # Second function of pair -> opened relations
+        self.backward_operations_handler = dict()
+        self.symmetric_operations_handler = dict()  # Pair -> opened relations
+        self.relations = relations
+        self.relation_index = dict()  # Kind of relation -> function name -> roles of function in relations
+        self.relation_sequence = 0  # Number of the last opened relation
+        self.related_operations = {kind: set() for kind in relations}  # First operations of created relations
+        self.function_summaries = dict()  # Summaries of function walks which can be replayed
+        self.called_functions = list()  # Names of all called user functions, in order of calls
+        self.recursion_cutoffs = 0  # Number of calls skipped because of recursion
+        self.resources_table = SymbolTable(Resource.symbols)  # Index of shared resources
+        self.local_resources_table = SymbolTable(Resource.symbols)
+        self.mutexes_table = SymbolTable(Lock.symbols)
+        self.operation_positions = dict()  # Operation -> position of operation in list of MASCM operations
+
+    def next_relation_number(self) -> int:
+        """ Method return number of newly opened relation, numbers grow in order of opening
+        :return: Int with number
+        """
+        self.relation_sequence += 1
+        return self.relation_sequence
+
+    def __repr__(self):
+        return f"BuildContext(relations={self.relations})"
@@ -4,32 +4,30 @@ __email__ = "damian.giebas@gmail.com"
 __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
-from collections import deque
+from collections import defaultdict, deque, namedtuple
 import config as c
-from copy import deepcopy
 from helpers.exceptions import MASCMException
 from helpers.mascm_helper import extract_resource_name
 import logging
-from itertools import combinations
+from itertools import combinations, product
+from mascm.build_context import BuildContext
 from mascm.edge import Edge
+from mascm.edge_list import EdgeList
 from mascm.lock import Lock
 from mascm.mascm import MultithreadedApplicationSourceCodeModel
 from mascm.operation import Operation
 from mascm.relations import Relations
 from mascm.resource import Resource
+from mascm.symbol_table import resource_symbol
 from mascm.thread import Thread
 from mascm.time_unit import TimeUnit
 from parsing_utils import Function
 from pycparser.c_ast import *
-from typing import Optional
+from typing import Iterable, Optional
 import warnings
 
 __macro_func_pref = "__builtin_{}"
 
-# List of boolean value which contains only True value to know about nesting loops
-__is_loop_body = []
-
-expected_definitions = list()
 main_function_name = c.main_function_name if hasattr(c, "main_function_name") else "main"
 memory_allocation_ops = ('malloc', 'calloc', 'realloc')
 relations: dict = {  # Names of functions between which there are sequential relationships
@@ -40,13 +38,22 @@ relations: dict = {  # Names of functions between which there are sequential rel
     'symmetric': [('va_start', 'va_arg'), ('va_arg', 'va_end')]
 }
 
-forward_operations_handler = list()
-backward_operations_handler = dict()
-symmetric_operations_handler = list()
-function_call_stack = deque()
 RECURSION_MAX_DEPTH = 0
-recursion_function = set()
-threads_stack = list()
+
+# Operations with side effects outside of created operations, function walks which contain them are not summarized
+__summary_blocking_operations = ("pthread_create", "pthread_mutexattr_settype", "pthread_mutex_init")
+
+OperationTemplate = namedtuple("OperationTemplate", (
+    "node", "function", "args", "is_loop_body_operation", "is_if_else_block_operation", "is_switch_case_operation",
+    "related_mutex", "switch_parent"
+))
+FunctionSummary = namedtuple("FunctionSummary", ("operations", "local_resources", "called_functions"))
+RelationRole = namedtuple("RelationRole", ("pair", "is_first", "is_second"))
+ThreadDescriptor = namedtuple("ThreadDescriptor", ("index", "name", "depth", "events"))
+StructureIndex = namedtuple("StructureIndex", (
+    "outside_if_else", "outside_loop", "outside_switch", "next_same_node", "first_same_node", "last_loop",
+    "run_start", "next_other_function", "next_other_function_in_thread", "switch_cases"
+))
 
 
 def is_resource_shared(op1: Operation, op2: Operation, resources: list, local_resource: bool = False) -> bool:
@@ -78,15 +85,54 @@ def find_multithreaded_relations(mascm) -> None:
     if not time_units:
         return
 
+    relation_names = set().union(*mascm.context.relation_index.values())  # Names of functions in any relation
     for time_unit in time_units:
         for t1, t2 in combinations(time_unit, 2):
             logging.debug(f"Searching relation between: {t1}, {t2}")
             for op in t1.operations + t2.operations:
+                if op.name not in relation_names:
+                    continue
                 operation_is_in_forward_relation(mascm, op, check_thread=False)
                 operation_is_in_backward_relation(mascm, op, check_thread=False)
                 operation_is_in_symmetric_relation(mascm, op, check_thread=False)
 
 
+def create_relation_index(relations: dict) -> dict:
+    """ Function create index of roles of functions in relations
+
+    :param relations: Dict with sets of function pairs for every kind of relation
+    :return: Dict with dict of function name and list of RelationRole for every kind of relation
+    """
+    index = dict()
+    for kind, pairs in relations.items():
+        roles = defaultdict(list)
+        for pair in pairs:
+            first_names = (pair[0], __macro_func_pref.format(pair[0]))
+            second_names = (pair[1], __macro_func_pref.format(pair[1]))
+            for name in dict.fromkeys(first_names + second_names):
+                roles[name].append(RelationRole(pair, name in first_names, name in second_names))
+        index[kind] = dict(roles)
+    return index
+
+
+def find_opened_relation(handler: dict, keys: Iterable) -> Optional[tuple]:
+    """ Function find relation opened as the first one, among relations stored in handler under given keys
+
+    :param handler: Dict with key and dict of opened relations with their sequence numbers, in order of opening
+    :param keys: Keys of handler which should be checked
+    :return: Tuple with key and opened relation, or None if there is no opened relation
+    """
+    found, found_sequence_number = None, None
+    for key in keys:
+        opened = handler.get(key)
+        if not opened:
+            continue
+        relation, sequence_number = next(iter(opened.items()))
+        if (found is None) or (sequence_number < found_sequence_number):
+            found, found_sequence_number = (key, relation), sequence_number
+    return found
+
+
 def operation_is_in_forward_relation(mascm, operation: Operation, check_thread: bool = True) -> None:
     """ Function check the operation can be a part of forward relation, and create it
 
@@ -94,29 +140,24 @@ def operation_is_in_forward_relation(mascm, operation: Operation, check_thread:
     :param operation: Operation
     :param check_thread: Flag used to force searching only within operation's thread
     """
-
-    forward_relations = set(relations["forward"] + c.relations["forward"])
-    for pair in forward_relations:
-        __func_name0 = __macro_func_pref.format(pair[0])
-        __func_name1 = __macro_func_pref.format(pair[1])
-
-        foo = {'pair': pair, 1: operation}
-        if (operation.name in (pair[0], __func_name0)) and (foo not in forward_operations_handler):
-            forward_operations_handler.append(foo)
-        elif operation.name in (pair[1], __func_name1):
-            try:
-                data = next((d for d in forward_operations_handler if d["pair"][1] in (pair[1], __func_name1)))
-            except StopIteration:
+    context = mascm.context
+    forward_operations_handler = context.forward_operations_handler
+    for pair, is_first, is_second in context.relation_index["forward"].get(operation.name, ()):
+        if is_first and ((pair, operation) not in forward_operations_handler.get(pair[1], ())):
+            forward_operations_handler.setdefault(pair[1], dict())[(pair, operation)] = context.next_relation_number()
+        elif is_second:
+            found = find_opened_relation(forward_operations_handler, (pair[1], __macro_func_pref.format(pair[1])))
+            if found is None:
                 continue
-            if not is_resource_shared(data[1], operation, mascm.resources):
+            key, (_, first_operation) = found
+            if not is_resource_shared(first_operation, operation, mascm.resources):
                 continue
-            if check_thread and data[1].thread.index != operation.thread.index:
+            if check_thread and first_operation.thread.index != operation.thread.index:
                 continue
-            edge = Edge(data[1], operation)
-            if (edge not in mascm.relations.forward) and \
-                    not any(e for e in mascm.relations.forward if edge.first == e.first):
-                mascm.relations.forward.append(edge)
-                forward_operations_handler.remove(data)
+            if first_operation not in context.related_operations["forward"]:
+                context.related_operations["forward"].add(first_operation)
+                mascm.relations.forward.append(Edge(first_operation, operation))
+                del forward_operations_handler[key][found[1]]
 
 
 def operation_is_in_backward_relation(mascm, operation: Operation, check_thread: bool = True) -> None:
@@ -126,24 +167,21 @@ def operation_is_in_backward_relation(mascm, operation: Operation, check_thread:
     :param operation: Operation
     :param check_thread: Flag used to force searching only within operation's thread
     """
-    backward_relations = set(relations["backward"] + c.relations["backward"])
-    for pair in backward_relations:
-        __func_name0 = __macro_func_pref.format(pair[0])
-        __func_name1 = __macro_func_pref.format(pair[1])
-
-        if operation.name in (pair[0], __func_name0):
+    context = mascm.context
+    backward_operations_handler = context.backward_operations_handler
+    for pair, is_first, is_second in context.relation_index["backward"].get(operation.name, ()):
+        if is_first:
             backward_operations_handler[pair] = operation
-        elif operation.name in (pair[1], __func_name1) and (pair in backward_operations_handler.keys()):
+        elif is_second and (pair in backward_operations_handler):
             if check_thread and backward_operations_handler[pair].thread.index != operation.thread.index:
                 continue
             first_operation = backward_operations_handler[pair]
             # TODO Check it for this relation
             # if not is_resource_shared(first_operation, operation, mascm.resources, True):
             #     continue
-            edge = Edge(first_operation, operation)
-            if (edge not in mascm.relations.backward) and \
-                    not any(e for e in mascm.relations.backward if first_operation == e.first):
-                mascm.relations.backward.append(edge)
+            if first_operation not in context.related_operations["backward"]:
+                context.related_operations["backward"].add(first_operation)
+                mascm.relations.backward.append(Edge(first_operation, operation))
                 del backward_operations_handler[pair]
 
 
@@ -154,30 +192,27 @@ def operation_is_in_symmetric_relation(mascm, operation: Operation, check_thread
     :param operation: Operation
     :param check_thread: Flag used to force searching only within operation's thread
     """
-    symmetric_relations = set(relations["symmetric"] + c.relations["symmetric"])
-    for pair in symmetric_relations:
-        __func_name0 = __macro_func_pref.format(pair[0])
-        __func_name1 = __macro_func_pref.format(pair[1])
-
-        if operation.name in (pair[0], __func_name0):
-            symmetric_operations_handler.append({'pair': pair, 1: operation})
-        if operation.name in (pair[1], __func_name1):
-            try:
-                data = next(
-                    (d for d in symmetric_operations_handler
-                     if (d["pair"][0] in (pair[0], __func_name0)) and (d["pair"][1] in (pair[1], __func_name1)))
-                )
-            except StopIteration:
+    context = mascm.context
+    symmetric_operations_handler = context.symmetric_operations_handler
+    for pair, is_first, is_second in context.relation_index["symmetric"].get(operation.name, ()):
+        if is_first:
+            # The same operation can be opened many times, so every opening is distinguished by sequence number
+            sequence_number = context.next_relation_number()
+            symmetric_operations_handler.setdefault(pair, dict())[(sequence_number, operation)] = sequence_number
+        if is_second:
+            keys = product((pair[0], __macro_func_pref.format(pair[0])), (pair[1], __macro_func_pref.format(pair[1])))
+            found = find_opened_relation(symmetric_operations_handler, keys)
+            if found is None:
                 continue
-            if not is_resource_shared(data[1], operation, mascm.resources, True):
+            key, (_, first_operation) = found
+            if not is_resource_shared(first_operation, operation, mascm.resources, True):
                 continue
-            if check_thread and data[1].thread.index != operation.thread.index:
+            if check_thread and first_operation.thread.index != operation.thread.index:
                 continue
-            edge = Edge(data[1], operation)
-            if (edge not in mascm.relations.symmetric) and not \
-                    any(e for e in mascm.relations.symmetric if data[1] == e.first):
-                mascm.relations.symmetric.append(edge)
-                symmetric_operations_handler.remove(data)
+            if first_operation not in context.related_operations["symmetric"]:
+                context.related_operations["symmetric"].add(first_operation)
+                mascm.relations.symmetric.append(Edge(first_operation, operation))
+                del symmetric_operations_handler[key][found[1]]
 
 
 def add_edge_to_mascm(mascm, edge: Edge) -> None:
@@ -198,6 +233,7 @@ def add_mutex_to_mascm(mascm, node, struct_name: Optional[str] = None) -> None:
     """
     lock = Lock(node, len(mascm.q) + 1, struct_name)
     mascm.q.append(lock)
+    mascm.context.mutexes_table.add(lock)
 
 
 def add_operation_to_mascm(mascm, node: Node, thread: Thread, function: str) -> Operation:
@@ -212,6 +248,7 @@ def add_operation_to_mascm(mascm, node: Node, thread: Thread, function: str) ->
     operation_is_in_forward_relation(mascm, op)
     operation_is_in_backward_relation(mascm, op)
     operation_is_in_symmetric_relation(mascm, op)
+    mascm.context.operation_positions[op] = len(mascm.o)
     mascm.o.append(op)
     return op
 
@@ -239,6 +276,27 @@ def add_resource_to_mascm(mascm, node: Node, names: Optional[set] = None) -> Non
                 break
 
     mascm.r.append(r)
+    mascm.context.resources_table.add(r)
+
+
+def add_local_resource_to_mascm(mascm, resource: Resource) -> None:
+    """ Add Resource object into list of MASCM's local resources
+
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param resource: Resource object
+    """
+    mascm.local_resources.append(resource)
+    mascm.context.local_resources_table.add(resource)
+
+
+def remove_local_resource(mascm, resource: Resource) -> None:
+    """ Remove first local resource with the same names as given resource from MASCM
+
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param resource: Resource object
+    """
+    index = next(i for i, r in enumerate(mascm.local_resources) if r.has_names(resource.names))
+    mascm.context.local_resources_table.remove(mascm.local_resources.pop(index))
 
 
 def parse_list_of_operations(mascm, nodes: list, thread: Thread, functions_definition: dict, function: str) -> list:
@@ -382,8 +440,7 @@ def parse_do_while_loop(mascm, node: DoWhile, thread: Thread, functions_definiti
     :param function: Current function
     :return: List with function calls
     """
-    global __is_loop_body
-    __is_loop_body.append(True)
+    mascm.context.is_loop_body.append(True)
     functions_call = list()
     do_operation = add_operation_to_mascm(mascm, node, thread, function)
     stmt = node.stmt
@@ -405,13 +462,13 @@ def parse_do_while_loop(mascm, node: DoWhile, thread: Thread, functions_definiti
     if resource:
         while_operation.add_use_resource(resource)
 
-    do_index = mascm.o.index(do_operation)
-    while_index = mascm.o.index(while_operation)
+    do_index = mascm.context.operation_positions[do_operation]
+    while_index = mascm.context.operation_positions[while_operation]
     for o in mascm.o[do_index:while_index]:
-        o.is_loop_body_operation = __is_loop_body[-1]
-    while_operation.is_loop_body_operation = __is_loop_body[-1]
+        o.is_loop_body_operation = mascm.context.is_loop_body[-1]
+    while_operation.is_loop_body_operation = mascm.context.is_loop_body[-1]
 
-    __is_loop_body.pop()
+    mascm.context.is_loop_body.pop()
     return functions_call
 
 
@@ -425,8 +482,7 @@ def parse_for_loop(mascm, node: For, thread: Thread, functions_definition: dict,
     :param function: Current function
     :return: List with function calls
     """
-    global __is_loop_body
-    __is_loop_body.append(True)
+    mascm.context.is_loop_body.append(True)
     functions_call = list()
     init = node.init
     if isinstance(init, DeclList):
@@ -460,11 +516,11 @@ def parse_for_loop(mascm, node: For, thread: Thread, functions_definition: dict,
     else:
         logging.critical(f"When parsing a for step, an unsupported item of type '{type(n)}' was encountered.")
 
-    o_index = mascm.o.index(operation)
+    o_index = mascm.context.operation_positions[operation]
     for o in mascm.o[o_index:]:
-        o.is_loop_body_operation = __is_loop_body[-1]
+        o.is_loop_body_operation = mascm.context.is_loop_body[-1]
 
-    __is_loop_body.pop()
+    mascm.context.is_loop_body.pop()
     return functions_call
 
 
@@ -505,7 +561,7 @@ def parse_if_statement(mascm, node: If, thread: Thread, functions_definition: di
             functions_call.extend(parse_list_of_operations(mascm, [op], thread, functions_definition, function))
 
     # Mechanism for detecting where if/else is finished
-    if_o_index = mascm.operations.index(if_o)
+    if_o_index = mascm.context.operation_positions[if_o]
     for o in mascm.operations[if_o_index:]:
         o.is_if_else_block_operation = True
     return functions_call
@@ -521,7 +577,6 @@ def parse_pthread_mutex_lock(mascm, node: FuncCall, thread: Thread, function: st
     :param function: Current function
     :return: Operation object
     """
-    lock = None
     try:
         mutex_name = node.args.exprs[0].expr.name
     except AttributeError as ae:
@@ -529,9 +584,7 @@ def parse_pthread_mutex_lock(mascm, node: FuncCall, thread: Thread, function: st
         mutex_name = node.args.exprs[0].name.name
     if hasattr(node.args.exprs[0], "field"):  # Dirty hack for searching mutex which is part of struct
         mutex_name = node.args.exprs[0].field.name
-    for m in mascm.q:
-        if mutex_name == m.name:
-            lock = m
+    lock = mascm.context.mutexes_table.last(mutex_name)
     if lock is None:
         raise MASCMException(f"Cannot find mutex: {mutex_name}")
     operation = add_operation_to_mascm(mascm, node, thread, function)
@@ -549,7 +602,6 @@ def parse_pthread_mutex_unlock(mascm, node: FuncCall, thread: Thread, function:
     :param function: Current function
     :return: Operation object
     """
-    lock = None
     try:
         mutex_name = node.args.exprs[0].expr.name
     except AttributeError as ae:
@@ -557,9 +609,7 @@ def parse_pthread_mutex_unlock(mascm, node: FuncCall, thread: Thread, function:
         mutex_name = node.args.exprs[0].name.name
     if hasattr(node.args.exprs[0], "field"):  # Dirty hack for searching mutex which is part of struct
         mutex_name = node.args.exprs[0].field.name
-    for m in mascm.q:
-        if mutex_name == m.name:
-            lock = m
+    lock = mascm.context.mutexes_table.last(mutex_name)
     if lock is None:
         raise MASCMException(f"Cannot find mutex: {mutex_name}")
     operation = add_operation_to_mascm(mascm, node, thread, function)
@@ -576,14 +626,10 @@ def parse_id(mascm, node: ID, operation: Optional[Operation]) -> tuple:
     :return: Tuple with resource name given from ID node, and shared resource (or none) related with ID name.
     """
     resource_name = extract_resource_name(node)
-    resource = None
-    for shared_resource in mascm.r:
-        if resource_name in shared_resource:
-            # If shared resource is condition than dependencies operation should be added
-            if operation is not None:
-                operation.add_use_resource(shared_resource)
-            resource = shared_resource
-            break
+    resource = mascm.context.resources_table.first(resource_symbol(resource_name))
+    # If shared resource is condition than dependencies operation should be added
+    if (resource is not None) and (operation is not None):
+        operation.add_use_resource(resource)
 
     return resource_name, resource
 
@@ -598,7 +644,6 @@ def parse_pthread_create(mascm, node: FuncCall, thread: Thread, functions_defini
     :param function: Current function
     :return: List with function calls
     """
-    global __is_loop_body
     functions_call = list()
 
     args, calls = parse_expr_list(mascm, node.args, thread, functions_definition, function)
@@ -613,18 +658,25 @@ def parse_pthread_create(mascm, node: FuncCall, thread: Thread, functions_defini
     if args[3] == '0':  # Is null value
         pass
     elif isinstance(args[3], str):
-        resource = next(r for r in mascm.resources + mascm.local_resources if args[3] in r)
+        symbol = resource_symbol(args[3])
+        resource = mascm.context.resources_table.first(symbol)
+        if resource is None:
+            resource = mascm.context.local_resources_table.first(symbol)
+        if resource is None:
+            raise MASCMException(f"Cannot find resource passed to thread: {args[3]}")
         for name in function_definition.function_args:
             resource.add_name(name)
-        if resource not in mascm.resources:
+        # Resources are compared by names, because shared resource is a copy of local resource
+        if not any(r.has_names(resource.names) for r in mascm.resources):
             add_resource_to_mascm(mascm, resource.node, resource.names)
-        if resource in mascm.local_resources:
-            mascm.local_resources.remove(resource)
+        if any(r.has_names(resource.names) for r in mascm.local_resources):
+            remove_local_resource(mascm, resource)
     else:
         m = f"When parsing a pthread_create, an unsupported argument '{type(args[3])}' was encountered."
         logging.critical(m)
 
-    for i in range(2 if __is_loop_body else 1):  # If threads use this same function and are created in loop
+    # If threads use this same function and are created in loop
+    for i in range(2 if mascm.context.is_loop_body else 1):
         new_thread = Thread(len(mascm.threads), node.args, thread.depth + 1)
         mascm.t.append(new_thread)
         functions_call.append((new_thread, function_definition))
@@ -702,11 +754,7 @@ def parse_assignment(mascm, node: Assignment, thread: Thread, functions_definiti
     resource_name = extract_resource_name(node)  # If lvalue is ID of shared resource than it will be reported
     functions_call.extend(parse_list_of_operations(mascm, [node.rvalue], thread, functions_definition, function))
 
-    resource = None
-    for shared_resource in mascm.r:
-        if resource_name in shared_resource:
-            resource = shared_resource
-
+    resource = mascm.context.resources_table.last(resource_symbol(resource_name))
     if resource is None:
         add_operation_to_mascm(mascm, node, thread, function)
         return functions_call
@@ -771,13 +819,13 @@ def parse_unary_op(mascm, node: UnaryOp, thread: Thread, functions_definition: d
         elif expr.name in functions_definition.keys():
             logging.debug(f"Operation of getting pointer to function {expr.name} found!")
             name, _ = parse_id(mascm, expr, None)
-        elif any(lr for lr in mascm.local_resources if expr.name in lr):
+        elif resource_symbol(expr.name) in mascm.context.local_resources_table:
             logging.debug(f"Operation of getting pointer to local variable {expr.name} found!")
             name, _ = parse_id(mascm, expr, None)
-        elif any(r for r in mascm.resources if expr.name in r):
+        elif resource_symbol(expr.name) in mascm.context.resources_table:
             logging.debug(f"Operation of getting pointer to shared variable {expr.name} found!")
             name, _ = parse_id(mascm, expr, None)
-        elif any(m for m in mascm.mutexes if expr.name == m.name):
+        elif expr.name in mascm.context.mutexes_table:
             logging.debug(f"Operation of getting pointer to mutex {expr.name} found!")
             name, _ = parse_id(mascm, expr, None)
         else:
@@ -896,6 +944,8 @@ def parse_func_call(mascm, node: FuncCall, thread: Thread, functions_definition:
     elif func_name == "pthread_mutex_init":
         functions_call.extend(parse_pthread_mutex_init(mascm, node, thread, functions_definition, function))
     elif func_name in functions_definition.keys():
+        mascm.context.called_functions.append(func_name)
+        function_call_stack = mascm.context.function_call_stack
         num_of_calls = len([fname for fname in function_call_stack if fname == func_name])
         calls = list()
         if num_of_calls < 1:
@@ -903,23 +953,21 @@ def parse_func_call(mascm, node: FuncCall, thread: Thread, functions_definition:
             function_definition = functions_definition[func_name]
             if any(arg for arg in args if isinstance(arg, str)):
                 for i, arg in enumerate(args):
-                    try:
-                        resource = next(r for r in mascm.resources if arg in r)
-                    except StopIteration:
-                        pass
-                    else:
+                    resource = mascm.context.resources_table.first(resource_symbol(arg))
+                    if resource is not None:
                         name = function_definition.function_args[i]
                         resource.add_name(name)
 
         add_operation_to_mascm(mascm, node, thread, func_name)
         # To avoid crash on recursion
         if num_of_calls > RECURSION_MAX_DEPTH:
-            recursion_function.add(func_name)
+            mascm.context.recursion_function.add(func_name)
+            mascm.context.recursion_cutoffs += 1
             return functions_call
         function_call_stack.appendleft(func_name)
         functions_call.extend(calls)
-        result = parse_function_definition(mascm, functions_definition[func_name], thread, functions_definition,
-                                           func_name)
+        result = walk_function_definition(mascm, functions_definition[func_name], thread, functions_definition,
+                                          func_name)
         functions_call.extend(result)
         function_call_stack.remove(func_name)
     elif func_name == "assert":
@@ -930,10 +978,9 @@ def parse_func_call(mascm, node: FuncCall, thread: Thread, functions_definition:
         functions_call.extend(calls)
         o = add_operation_to_mascm(mascm, node, thread, function)
         for name in names:
-            for shared_resource in mascm.resources:
-                if name in shared_resource:
-                    o.add_use_resource(shared_resource)
-                    break
+            shared_resource = mascm.context.resources_table.first(resource_symbol(name))
+            if shared_resource is not None:
+                o.add_use_resource(shared_resource)
     return functions_call
 
 
@@ -1014,17 +1061,14 @@ def parse_decl(mascm, node: Decl, thread: Thread, functions_definition: dict, fu
     else:
         functions_call.extend(parse_list_of_operations(mascm, [init], thread, functions_definition, function))
 
-    try:
-        shared_resource = next(r for r in mascm.resources if name in r)
-    except StopIteration:
-        shared_resource = None
+    shared_resource = mascm.context.resources_table.first(resource_symbol(name))
     if (name is not None) and (shared_resource is not None):
         shared_resource.add_name(node.name)
     else:
         local_resource = Resource(node)
         if name is not None:
             local_resource.add_name(name)
-        mascm.local_resources.append(local_resource)
+        add_local_resource_to_mascm(mascm, local_resource)
 
     add_operation_to_mascm(mascm, node, thread, function)
     return name, functions_call
@@ -1104,7 +1148,7 @@ def parse_switch(mascm, node: Switch, thread: Thread, functions_definition: dict
         logging.critical(f"When parsing a switch stmt, an unsupported item of type '{type(stmt)}' was encountered.")
 
     # Mark all operations added later as switch_case_operations
-    switch_index = mascm.operations.index(o)
+    switch_index = mascm.context.operation_positions[o]
     for op in mascm.operations[:switch_index:-1]:
         if op == o:
             break
@@ -1136,8 +1180,7 @@ def parse_while_loop(mascm, node: While, thread: Thread, functions_definition: d
     :param function: Current function
     :return: List with function calls
     """
-    global __is_loop_body
-    __is_loop_body.append(True)
+    mascm.context.is_loop_body.append(True)
     functions_call = list()
     o = add_operation_to_mascm(mascm, node, thread, function)
     cond = node.cond
@@ -1154,10 +1197,10 @@ def parse_while_loop(mascm, node: While, thread: Thread, functions_definition: d
         functions_call.extend(parse_compound(mascm, stmt, thread, functions_definition, function))
     else:
         logging.critical(f"When parsing a while body, an unsupported item of type '{type(cond)}' was encountered.")
-    o_index = mascm.o.index(o)
+    o_index = mascm.context.operation_positions[o]
     for o in mascm.o[o_index:]:
-        o.is_loop_body_operation = __is_loop_body[-1]
-    __is_loop_body.pop()
+        o.is_loop_body_operation = mascm.context.is_loop_body[-1]
+    mascm.context.is_loop_body.pop()
     return functions_call
 
 
@@ -1181,6 +1224,97 @@ def parse_function_definition(mascm, node: Function, thread: Thread, functions_d
     return functions_call
 
 
+def __create_function_summary(mascm, start: int, local_start: int, calls_start: int) -> Optional[FunctionSummary]:
+    """ Function create summary of operations added to MASCM by function walk
+
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param start: Index of first operation added by walk
+    :param local_start: Index of first local resource added by walk
+    :param calls_start: Index of first user function called during walk in list of called functions
+    :return: FunctionSummary object or None if walk cannot be summarized
+    """
+    operations = mascm.o[start:]
+    positions = {id(op): i for i, op in enumerate(operations)}
+    templates = list()
+    for op in operations:
+        if op.name in __summary_blocking_operations:
+            return None
+        switch_parent = None
+        if op.is_case:
+            switch_parent = positions.get(id(op.switch_parent_operation))
+            if switch_parent is None:  # Case is linked with switch from outside of function
+                return None
+        templates.append(OperationTemplate(
+            op.node, op.function, tuple(op.args), op.is_loop_body_operation, op.is_if_else_block_operation,
+            op.is_switch_case_operation, op.related_mutex, switch_parent
+        ))
+    local_resources = tuple((r.node, frozenset(r.names)) for r in mascm.local_resources[local_start:])
+    return FunctionSummary(tuple(templates), local_resources, tuple(mascm.context.called_functions[calls_start:]))
+
+
+def __replay_function_summary(mascm, summary: FunctionSummary, thread: Thread) -> None:
+    """ Function add to MASCM operations described by summary, as if function body was parsed again
+
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param summary: FunctionSummary object
+    :param thread: Current thread
+    """
+    start = len(mascm.o)
+    for template in summary.operations:
+        op = add_operation_to_mascm(mascm, template.node, thread, template.function)
+        for resource in template.args[len(op.args):]:
+            op.add_use_resource(resource)
+        op.is_loop_body_operation = template.is_loop_body_operation
+        if template.is_if_else_block_operation:
+            op.is_if_else_block_operation = True
+        op.is_switch_case_operation = template.is_switch_case_operation
+        if template.related_mutex is not None:
+            op.related_mutex = template.related_mutex
+        if template.switch_parent is not None:
+            op.switch_parent_operation = mascm.o[start + template.switch_parent]
+    for node, names in summary.local_resources:
+        add_local_resource_to_mascm(mascm, Resource(node, names=set(names)))
+    mascm.context.called_functions.extend(summary.called_functions)
+
+
+def walk_function_definition(mascm, node: Function, thread: Thread, functions_definition: dict, function: str) -> list:
+    """ Function parse function definition, or replay summary of its previous parsing.
+    Summary is replayed only when parsing would give the same result: shared resources have the same names and none of
+    functions called during walk is currently on call stack. Walk is summarized only if it did not create threads,
+    shared resources or recursion, and did not change anything except operations and local resources added by it.
+
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param node: Function object
+    :param thread: Current thread
+    :param functions_definition: Dict with user functions definition
+    :param function: Current function
+    :return: List with function calls
+    """
+    context = mascm.context
+    key = (function, context.resources_table.generation)
+    summary = context.function_summaries.get(key)
+    if (summary is not None) and set(summary.called_functions).isdisjoint(context.function_call_stack):
+        logging.debug(f"Replaying summary of function {function}")
+        __replay_function_summary(mascm, summary, thread)
+        return list()
+
+    start, local_start, calls_start = len(mascm.o), len(mascm.local_resources), len(context.called_functions)
+    threads, cutoffs = len(mascm.t), context.recursion_cutoffs
+    prev_op = mascm.o[-1] if mascm.o else None
+    prev_op_args = len(prev_op.args) if prev_op is not None else 0
+
+    functions_call = parse_function_definition(mascm, node, thread, functions_definition, function)
+
+    if functions_call or (len(mascm.t) != threads) or (context.recursion_cutoffs != cutoffs) or \
+            (context.resources_table.generation != key[1]) or \
+            ((prev_op is not None) and (len(prev_op.args) != prev_op_args)):
+        return functions_call
+    summary = __create_function_summary(mascm, start, local_start, calls_start)
+    if summary is not None:
+        context.function_summaries[key] = summary
+    return functions_call
+
+
 def put_main_thread_to_model(mascm) -> None:
     """ Add to MASCM t0 as first/last thread in time units
 
@@ -1190,24 +1324,13 @@ def put_main_thread_to_model(mascm) -> None:
     mascm.t.append(thread)
 
 
-def __restore_global_variable() -> None:
-    """Function restore global variable to default state"""
-    global forward_operations_handler, backward_operations_handler, symmetric_operations_handler, function_call_stack
-    global recursion_function, threads_stack
-
-    forward_operations_handler = list()
-    backward_operations_handler = dict()
-    symmetric_operations_handler = list()
-    function_call_stack = deque()
-    recursion_function = set()
-    threads_stack = list()
-
-
-def __unexpected_declarations(defined_functions: dict):
+def __unexpected_declarations(mascm, defined_functions: dict):
     """ Function check there is some function declarations without definition
 
+    :param mascm: MultithreadedApplicationSourceCodeModel object
     :param defined_functions: Dict with defined functions
     """
+    expected_definitions = mascm.context.expected_definitions
     to_remove = list()
     for name, func in defined_functions.items():
         if any(name == decl.name for decl in expected_definitions):
@@ -1223,37 +1346,55 @@ def __unexpected_declarations(defined_functions: dict):
                       UserWarning)
 
 
+def create_thread_descriptor(thread: Thread) -> ThreadDescriptor:
+    """ Function describe thread by operations which have influence on time units
+    Events are: True for thread creation, name of thread for thread joining, and None for operation executed between
+    creation and joining of thread, which is always the last event.
+
+    :param thread: Thread object
+    :return: ThreadDescriptor object
+    """
+    events = list()
+    is_create = False
+    for o in thread.operations:
+        if o.name == "pthread_create":
+            is_create = True
+            events.append(True)
+        elif o.name == "pthread_join":
+            is_create = False
+            if events:
+                events.append(list(o.args[0].names)[0])
+        elif is_create:  # If thread has a operation between create and join
+            events.append(None)
+            break
+    return ThreadDescriptor(thread.index, thread.name, thread.depth, tuple(events))
+
+
 def create_time_units(mascm):
     """ Function parse operations from MASCM to detect time units and add to them
 
     :param mascm: MultithreadedApplicationSourceCodeModel object
     """
-    threads = deepcopy(mascm.threads)
-    threads = sorted(threads, key=lambda thread: thread.depth, reverse=True)
+    threads = sorted((create_thread_descriptor(t) for t in mascm.threads), key=lambda thread: thread.depth,
+                     reverse=True)
     units = list()
-    from collections import defaultdict
     tu_to_split = defaultdict(list)
     is_always_active = list()
     last_deep = None
 
     for t in threads:
-        is_create = False
-        for o in t.operations:
-            if o.name == "pthread_create":
-                is_create = True
-                tu_to_split[str(t)].append(True)
-            elif o.name == "pthread_join":
-                is_create = False
-                if tu_to_split:
-                    tu_to_split[str(t)].pop()
-                    tu_to_split[str(t)].append(list(o.args[0].names)[0])
-            elif is_create:  # If thread has a operation between create and join
+        for event in t.events:
+            if event is True:
+                tu_to_split[str(t.index)].append(True)
+            elif event is not None:
+                tu_to_split[str(t.index)].pop()
+                tu_to_split[str(t.index)].append(event)
+            else:
                 units[-1].append(t)
                 is_always_active.append(t)
-                break
 
-        if tu_to_split[str(t)]: # If there is
-            tu_s = str(tu_to_split[str(t)])
+        if tu_to_split[str(t.index)]:  # If there is
+            tu_s = str(tu_to_split[str(t.index)])
             tu_s2 = str(list(t.name for t in units[-1]))
             if tu_s == tu_s2:
                 tu = units.pop()
@@ -1261,9 +1402,9 @@ def create_time_units(mascm):
                     new = TimeUnit()
                     new.append(t4ntu)
                     units.append(new)
-            del tu_to_split[str(t)]
+            del tu_to_split[str(t.index)]
         else:
-            del tu_to_split[str(t)]
+            del tu_to_split[str(t.index)]
 
         if last_deep != t.depth:
             units.append(TimeUnit())
@@ -1275,15 +1416,16 @@ def create_time_units(mascm):
             if (t not in u) and any(tu for tu in u if tu.depth > t.depth):
                 u.append(t)
 
-    first_part = deepcopy(units)
+    first_part = list(units)
     first_part.reverse()
     last_unit = first_part.pop()
     while last_unit and first_part and (len(last_unit) == len(first_part[-1])) and \
             (last_unit[-1].depth == first_part[-1][-1].depth):
         first_part.pop()
 
+    threads = {t.index: t for t in mascm.threads}
     for unit in first_part + units:
-        mascm.time_units.append(sorted(unit, key=lambda thread: thread.index))
+        mascm.time_units.append(sorted((threads[t.index] for t in unit), key=lambda thread: thread.index))
 
 
 def add_usage_dependencies_edge(mascm, o: Operation):
@@ -1303,121 +1445,162 @@ def add_usage_dependencies_edge(mascm, o: Operation):
             logging.debug("When creating a usage/dependency edge, & operation was encountered.")
 
 
+def __next_false(operations: list, attr_name: str) -> list:
+    """ Function find for every position first operation, at this position or after it, with false value of attribute
+
+    :param operations: List with Operation objects
+    :param attr_name: Name of boolean attribute of operation
+    :return: List with positions (or None) which is longer by one than list of operations
+    """
+    result = [None] * (len(operations) + 1)
+    for k in range(len(operations) - 1, -1, -1):
+        result[k] = k if not getattr(operations[k], attr_name) else result[k + 1]
+    return result
+
+
+def create_structure_index(operations: list) -> StructureIndex:
+    """ Function compute relationships between positions of operations, which are needed to create edges
+
+    :param operations: List with Operation objects
+    :return: StructureIndex object
+    """
+    n = len(operations)
+    next_same_node, first_same_node = [None] * n, [None] * n
+    last_node_position = dict()
+    for k in range(n - 1, -1, -1):
+        node_id = id(operations[k].node)
+        next_same_node[k] = last_node_position.get(node_id)
+        last_node_position[node_id] = k
+    for k, o in enumerate(operations):
+        first_same_node[k] = last_node_position[id(o.node)]
+
+    last_loop, run_start = [None] * (n + 1), [0] * n
+    switch_cases = defaultdict(list)
+    for k, o in enumerate(operations):
+        last_loop[k + 1] = k if isinstance(o.node, (While, For)) else last_loop[k]
+        if k and (operations[k - 1].function == o.function):
+            run_start[k] = run_start[k - 1]
+        else:
+            run_start[k] = k
+        if o.is_case and (o.switch_parent_operation is not None):
+            switch_cases[str(o.switch_parent_operation)].append(k)  # Representation identifies operation
+
+    next_other_function, next_other_function_in_thread = [None] * n, [None] * n
+    last_in_thread = dict()
+    for k in range(n - 1, -1, -1):
+        o = operations[k]
+        if k + 1 < n:
+            next_op = operations[k + 1]
+            next_other_function[k] = k + 1 if next_op.function != o.function else next_other_function[k + 1]
+        m = last_in_thread.get(o.thread.index)
+        if m is not None:
+            next_other_function_in_thread[k] = m if operations[m].function != o.function else \
+                next_other_function_in_thread[m]
+        last_in_thread[o.thread.index] = k
+
+    return StructureIndex(
+        __next_false(operations, "is_if_else_block_operation"), __next_false(operations, "is_loop_body_operation"),
+        __next_false(operations, "is_switch_case_operation"), next_same_node, first_same_node, last_loop, run_start,
+        next_other_function, next_other_function_in_thread, switch_cases
+    )
+
+
 def create_edges(mascm):
     """ Function create correct edges between MASCM operations
 
     :param mascm: MultithreadedApplicationSourceCodeModel object
     """
-    global recursion_function
     there_was_if = []
     is_for_while_loop = False
+    operations = mascm.o
+    index = create_structure_index(operations)
 
-    for i, o in enumerate(mascm.operations):
-        prev_op = mascm.o[i-1]
+    for i, o in enumerate(operations):
+        prev_op = operations[i-1]
         if i and (not prev_op.is_return) and (not prev_op.is_switch) and (prev_op.thread.index == o.thread.index):
             # Cannot link current action with return (return action are linked later)
             if not isinstance(prev_op.node, Break):
-                add_edge_to_mascm(mascm, Edge(mascm.o[i - 1], o))
+                add_edge_to_mascm(mascm, Edge(prev_op, o))
 
             # Linking last operation of for/while loop with first
-            next_op = mascm.o[i+1] if len(mascm.o) > i+1 else None
+            next_op = operations[i+1] if len(operations) > i+1 else None
             if is_for_while_loop and o.is_loop_body_operation and \
                     ((next_op is None) or (not next_op.is_loop_body_operation)) and not isinstance(o.node, Break):
-                for op in reversed(mascm.o[:i-1]):
-                    # Backward search first operation of loop for creating correct return edge
-                    if isinstance(op.node, While) or isinstance(op.node, For):
-                        add_edge_to_mascm(mascm, Edge(o, op))
-                        is_for_while_loop = False  # Disable flag if it is last operation
-                        break
+                # Last loop operation placed before previous operation is first operation of loop
+                j = index.last_loop[i-1]
+                if j is not None:
+                    add_edge_to_mascm(mascm, Edge(o, operations[j]))
+                    is_for_while_loop = False  # Disable flag if it is last operation
 
         if isinstance(o.node, If):  # Detecting if/else statement
             is_else = False
             # Searching else operation
-            for op in mascm.o[i+1:]:
-                if o.node == op.node:
-                    add_edge_to_mascm(mascm, Edge(o, op))
-                    is_else = True
-                    break
+            j = index.next_same_node[i]
+            if j is not None:
+                add_edge_to_mascm(mascm, Edge(o, operations[j]))
+                is_else = True
+            j = index.outside_if_else[i+1]  # First operation after if/else block
             if not is_else and there_was_if and not isinstance(prev_op.node, Break):
                 # Last operation in if statement should be linked with first operation after else block
                 there_was_if.pop()
                 last_edge = mascm.edges.pop()
-                for op in mascm.o[i+1:]:
-                    if not op.is_if_else_block_operation:
-                        # For case when If/else try create edge to operation after loop body
-                        if last_edge.first.is_loop_body_operation and not op.is_loop_body_operation:
-                            break
-                        add_edge_to_mascm(mascm, Edge(last_edge.first, op))
-                        break
+                # For case when If/else try create edge to operation after loop body
+                if (j is not None) and not (last_edge.first.is_loop_body_operation and
+                                            not operations[j].is_loop_body_operation):
+                    add_edge_to_mascm(mascm, Edge(last_edge.first, operations[j]))
             elif is_else:
                 there_was_if.append(True)
             elif not isinstance(prev_op.node, Break):
                 # Last operation in if statement should be linked with first operation after else block
                 last_edge = mascm.edges[-1]
-                for op in mascm.o[i+1:]:
-                    if not op.is_if_else_block_operation:
-                        add_edge_to_mascm(mascm, Edge(last_edge.second, op))
-                        break
+                if j is not None:
+                    add_edge_to_mascm(mascm, Edge(last_edge.second, operations[j]))
             else:
                 logging.debug(f"Skipping link the last operation of if statement {o.name} with firs operation after it")
 
         elif isinstance(o.node, While) or isinstance(o.node, For):
             # TODO Except while/for node edge should go to condition node
             is_for_while_loop = True
-            for op in mascm.o[i+1:]:
-                if not op.is_loop_body_operation:
-                    add_edge_to_mascm(mascm, Edge(o, op))
-                    break
+            j = index.outside_loop[i+1]
+            if j is not None:
+                add_edge_to_mascm(mascm, Edge(o, operations[j]))
         elif isinstance(o.node, DoWhile):
-            for op in mascm.o[:i]:
-                if op.node == o.node:
-                    add_edge_to_mascm(mascm, Edge(o, op))
-                    break
+            j = index.first_same_node[i]
+            if j < i:
+                add_edge_to_mascm(mascm, Edge(o, operations[j]))
         elif isinstance(o.node, Switch):
-            for op in mascm.o[i+1:]:
-                if not op.is_switch_case_operation:
-                    break
-                if op.is_case and (op.switch_parent_operation == o):
-                    add_edge_to_mascm(mascm, Edge(o, op))
+            end = index.outside_switch[i+1]  # First operation after switch body
+            for j in index.switch_cases.get(str(o), ()):
+                if (j > i) and ((end is None) or (j < end)):
+                    add_edge_to_mascm(mascm, Edge(o, operations[j]))
             continue
         elif isinstance(o.node, Break):
-            attr_name = ""
             if o.is_loop_body_operation:
-                attr_name = 'is_loop_body_operation'
+                j = index.outside_loop[i+1]
             elif o.is_switch_case_operation:
-                attr_name = 'is_switch_case_operation'
+                j = index.outside_switch[i+1]
             else:
                 logging.critical(f"Cannot determine correct attribute for operation {o}")
                 raise AttributeError(f"Cannot determine correct attribute for operation {o}")
-            for op in mascm.operations[i+1:]:  # Searching first operation after loop
-                if getattr(op, attr_name):
-                    continue
-                else:
-                    break
-            add_edge_to_mascm(mascm, Edge(o, op))
+            # Searching first operation after loop, or the last operation if there is no such one
+            add_edge_to_mascm(mascm, Edge(o, operations[j if j is not None else -1]))
             continue
-        elif o.is_return and o.function in recursion_function:  # Detecting recursion
+        elif o.is_return and o.function in mascm.context.recursion_function:  # Detecting recursion
+            # First operation before return is always taken, than operations of recursion function placed before it
             first_op = None
-            o_subset = mascm.o[:i]
-            o_subset.reverse()
-            for op in o_subset:  # Backward search of operation from parent function
-                if (first_op is None) or (op.function == o.function):
-                    # First operation is always as last operation from recursion function
-                    # If op is operation from parent function than first_op is first operation of nested function
-                    first_op = op
-                else:
-                    break
+            if i > 1 and operations[i-2].function == o.function:
+                first_op = operations[index.run_start[i-2]]
+            elif i > 0:
+                first_op = prev_op
             add_edge_to_mascm(mascm, Edge(o, first_op))
-            for op in mascm.o[i+1:]:
-                if op.function != o.function:
-                    add_edge_to_mascm(mascm, Edge(o, op))
-                    break
+            j = index.next_other_function[i]
+            if j is not None:
+                add_edge_to_mascm(mascm, Edge(o, operations[j]))
         elif o.is_return and (o.function != c.main_function_name):
             # Link return with operation in operation in parent function if it is not return from main
-            for op in mascm.o[i+1:]:
-                if (op.function != o.function) and (op.thread.index == o.thread.index):
-                    add_edge_to_mascm(mascm, Edge(o, op))
-                    break
+            j = index.next_other_function_in_thread[i]
+            if j is not None:
+                add_edge_to_mascm(mascm, Edge(o, operations[j]))
         elif o.name == "pthread_mutex_lock":
             add_edge_to_mascm(mascm, Edge(o.related_mutex, o))
             continue  # There is no need check usage/dependencies edge
@@ -1430,80 +1613,125 @@ def create_edges(mascm):
         add_usage_dependencies_edge(mascm, o)
 
 
-def parse_global_trees(mascm, asts: deque) -> dict:
+def __is_mutex_field(field) -> bool:
+    """ Function check that field of struct is mutex or pointer to mutex
+
+    :param field: AST Node
+    :return: Boolean value
+    """
+    return isinstance(field, Decl) and \
+        (isinstance(field.type.type, IdentifierType) or isinstance(field.type.type.type, IdentifierType))\
+        and ((hasattr(field.type.type, "names") and "pthread_mutex_t" in field.type.type.names) or
+             (hasattr(field.type.type, "type") and "pthread_mutex_t" in field.type.type.type.names))  # Dirty hack do tectec pointer to mutex
+
+
+def collect_global_declarations(ast: FileAST) -> list:
+    """Function collect global declarations from AST of single translation unit.
+    Result depends only on given AST, so it can be stored together with AST and reused by next analysis.
+
+    :param ast: FileAST object
+    :return: list with pairs of declaration kind and tuple with arguments needed to register declaration
+    """
+    declarations = list()
+    for node in ast:
+        if isinstance(node, FuncDecl) or (hasattr(node, 'storage') and "extern" in node.storage):
+            continue
+        elif isinstance(node, Decl) and (not isinstance(node.type, (Struct, Enum))) and \
+                isinstance(node.type.type, IdentifierType) and ("pthread_mutex_t" in node.type.type.names):
+            declarations.append(("mutex", (node, None)))
+        elif isinstance(node, Decl) and isinstance(node.type, Enum):
+            logging.debug(f"Found enumeration declaration: {node}")
+        elif isinstance(node, Decl) and isinstance(node.type, Struct):
+            declarations.append(("struct", (node.type,)))
+        elif isinstance(node, FuncDef):
+            declarations.append(("function", (Function(node),)))
+            # It is declaration and (it is variable of type or variable which is pointer of type)
+        elif isinstance(node, Decl) and \
+                ((isinstance(node.type, TypeDecl) and isinstance(node.type.type, IdentifierType)) or
+                 (isinstance(node.type, PtrDecl) and isinstance(node.type.type, TypeDecl) and
+                  isinstance(node.type.type.type, IdentifierType))):
+            declarations.append(("resource", (node,)))
+        elif isinstance(node, Decl) and hasattr(node, 'type') and isinstance(node.type, TypeDecl) and\
+                isinstance(node.type.type, Struct):
+            declarations.append(("resource", (node,)))
+            # Dirty fix for find mutex into struct
+            for field in node.type.type:
+                if __is_mutex_field(field):
+                    declarations.append(("mutex", (field, node.name)))
+
+        elif isinstance(node, Decl) and isinstance(node.type, FuncDecl):
+            declarations.append(("expected", (node,)))
+        elif isinstance(node, Typedef) and hasattr(node, 'type') and isinstance(node.type, TypeDecl) and\
+                isinstance(node.type.type, Struct) and node.name == "thread_wrapper_arg_t":
+            for field in node.type.type:
+                if __is_mutex_field(field):
+                    declarations.append(("mutex", (field, node.name)))
+        else:
+            logging.debug(f"{node} is not expected")
+    return declarations
+
+
+def register_global_declarations(mascm, declarations: list, functions_definition: dict) -> None:
+    """Function add global declarations collected from translation unit to MASCM.
+    Mutexes are added into mascm.q, global variables are added into mascm.r.
+
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param declarations: list created by collect_global_declarations function
+    :param functions_definition: dict with function definitions which is updated by found definitions
+    """
+    for kind, args in declarations:
+        if kind == "mutex":
+            add_mutex_to_mascm(mascm, *args)
+        elif kind == "struct":
+            mascm.struct_defs.append(*args)
+        elif kind == "function":
+            func, = args
+            functions_definition[func.name] = func
+        elif kind == "resource":
+            add_resource_to_mascm(mascm, *args)
+        elif kind == "expected":
+            mascm.context.expected_definitions.append(*args)
+        else:
+            raise MASCMException(f"Unknown kind of global declaration: {kind}")
+
+
+def parse_global_trees(mascm, asts: deque, declarations: Optional[list] = None) -> dict:
     """Function parse all AST:s give as deque.
     If function find mutex it is added into mascm.q.
     If function find global variable it is added into mascm.r.
 
     :param mascm: MultithreadedApplicationSourceCodeModel object
     :param asts: deque object with AST's
+    :param declarations: Optional list with global declarations of every AST, collected earlier
     :return: dict with function definition
     """
     functions_definition = dict()
-    for ast in asts:
-        for node in ast:
-            if isinstance(node, FuncDecl) or (hasattr(node, 'storage') and "extern" in node.storage):
-                continue
-            elif isinstance(node, Decl) and (not isinstance(node.type, (Struct, Enum))) and \
-                    isinstance(node.type.type, IdentifierType) and ("pthread_mutex_t" in node.type.type.names):
-                add_mutex_to_mascm(mascm, node)
-            elif isinstance(node, Decl) and isinstance(node.type, Enum):
-                logging.debug(f"Found enumeration declaration: {node}")
-            elif isinstance(node, Decl) and isinstance(node.type, Struct):
-                mascm.struct_defs.append(node.type)
-            elif isinstance(node, FuncDef):
-                func = Function(node)
-                functions_definition[func.name] = func
-                # It is declaration and (it is variable of type or variable which is pointer of type)
-            elif isinstance(node, Decl) and \
-                    ((isinstance(node.type, TypeDecl) and isinstance(node.type.type, IdentifierType)) or
-                     (isinstance(node.type, PtrDecl) and isinstance(node.type.type, TypeDecl) and
-                      isinstance(node.type.type.type, IdentifierType))):
-                add_resource_to_mascm(mascm, node)
-            elif isinstance(node, Decl) and hasattr(node, 'type') and isinstance(node.type, TypeDecl) and\
-                    isinstance(node.type.type, Struct):
-                add_resource_to_mascm(mascm, node)
-                # Dirty fix for find mutex into struct
-                for field in node.type.type:
-                    if isinstance(field, Decl) and\
-                            (isinstance(field.type.type, IdentifierType) or isinstance(field.type.type.type, IdentifierType))\
-                            and ((hasattr(field.type.type, "names") and "pthread_mutex_t" in field.type.type.names) or
-                                 (hasattr(field.type.type, "type") and "pthread_mutex_t" in field.type.type.type.names)):  # Dirty hack do tectec pointer to mutex
-                        add_mutex_to_mascm(mascm, field, node.name)
-
-            elif isinstance(node, Decl) and isinstance(node.type, FuncDecl):
-                expected_definitions.append(node)
-            elif isinstance(node, Typedef) and hasattr(node, 'type') and isinstance(node.type, TypeDecl) and\
-                    isinstance(node.type.type, Struct) and node.name == "thread_wrapper_arg_t":
-                for field in node.type.type:
-                    if isinstance(field, Decl) and \
-                            (isinstance(field.type.type, IdentifierType) or isinstance(field.type.type.type, IdentifierType))\
-                            and ((hasattr(field.type.type, "names") and "pthread_mutex_t" in field.type.type.names) or
-                                 (hasattr(field.type.type, "type") and "pthread_mutex_t" in field.type.type.type.names)):  # Dirty hack do tectec pointer to mutex
-                        add_mutex_to_mascm(mascm, field, node.name)
-            else:
-                logging.debug(f"{node} is not expected")
+    if declarations is None:
+        declarations = [collect_global_declarations(ast) for ast in asts]
+    for ast_declarations in declarations:
+        register_global_declarations(mascm, ast_declarations, functions_definition)
     return functions_definition
 
 
-def create_mascm(asts: deque) -> MultithreadedApplicationSourceCodeModel:
+def create_mascm(asts: deque, declarations: Optional[list] = None) -> MultithreadedApplicationSourceCodeModel:
     """Function create MultithreadedApplicationSourceCodeModel
     :param asts: AST's deque
+    :param declarations: Optional list with global declarations of every AST, collected earlier
     :return: MultithreadedApplicationSourceCodeModel object
     """
-    global __is_loop_body
-    __is_loop_body = []
-    mascm = MultithreadedApplicationSourceCodeModel(list(), list(), list(), list(), list(), list(), Relations())
+    mascm = MultithreadedApplicationSourceCodeModel(list(), list(), list(), list(), list(), EdgeList(), Relations())
+    mascm.context = BuildContext({kind: set(pairs + c.relations[kind]) for kind, pairs in relations.items()})
+    mascm.context.relation_index = create_relation_index(mascm.context.relations)
     put_main_thread_to_model(mascm)
 
-    functions_definition = parse_global_trees(mascm, asts)
+    functions_definition = parse_global_trees(mascm, asts, declarations)
     functions = parse_function_definition(mascm, functions_definition[main_function_name], mascm.t[-1],
                                           functions_definition, main_function_name)
 
     while functions:
         new_functions = list()
         for thread, func in functions:
-            result = parse_function_definition(mascm, func, thread, functions_definition, func.name)
+            result = walk_function_definition(mascm, func, thread, functions_definition, func.name)
             new_functions.extend(result)
         functions = new_functions
 
@@ -1511,5 +1739,4 @@ def create_mascm(asts: deque) -> MultithreadedApplicationSourceCodeModel:
     create_edges(mascm)
     find_multithreaded_relations(mascm)
 
-    __restore_global_variable()
     return mascm
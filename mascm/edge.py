@@ -6,31 +6,61 @@ __version__ = "1.1"
 from collections import namedtuple
 from helpers.exceptions import MASCMException
 from helpers import EdgeType
+from typing import Optional
+
+__edge_kinds = dict()  # Pair of types of edge elements -> kind of edge
+
+
+def _edge_kind(first, second) -> Optional[EdgeType]:
+    """ Function return kind of edge between given elements, result is remembered for every pair of element types
+    :param first: First element of edge
+    :param second: Second element of edge
+    :return: EdgeType value or None if edge between given elements is unknown
+    """
+    key = (type(first), type(second))
+    try:
+        return __edge_kinds[key]
+    except KeyError:
+        pass
+
+    # Inline imports to avoid circular dependencies
+    from mascm.lock import Lock
+    from mascm.operation import Operation
+    from mascm.resource import Resource
+    kind = None
+    if isinstance(first, Operation) and isinstance(second, Operation):
+        kind = EdgeType.transition
+    elif isinstance(first, Operation) and isinstance(second, Resource):
+        kind = EdgeType.usage
+    elif isinstance(first, Resource) and isinstance(second, Operation):
+        kind = EdgeType.dependency
+    elif isinstance(first, Lock) and isinstance(second, Operation):
+        kind = EdgeType.locking
+    elif isinstance(first, Operation) and isinstance(second, Lock):
+        kind = EdgeType.unlocking
+    __edge_kinds[key] = kind
+    return kind
 
 
 class Edge(namedtuple("Pair", ["first", "second"])):
-    """ Edge class """
+    """ Edge class, kind of edge is determined when edge is created """
+    def __new__(cls, first, second):
+        self = super(Edge, cls).__new__(cls, first, second)
+        self.kind = _edge_kind(first, second)
+        return self
+
     @property
     def edge_type(self):
         """ Edge type property """
-        # Inline imports to avoid circular dependencies
-        from mascm.lock import Lock
-        from mascm.operation import Operation
-        from mascm.resource import Resource
-        if isinstance(self.first, Operation) and isinstance(self.second, Operation):
-            return EdgeType.transition
-        elif isinstance(self.first, Operation) and isinstance(self.second, Resource):
-            return EdgeType.usage
-        elif isinstance(self.first, Resource) and isinstance(self.second, Operation):
-            return EdgeType.dependency
-        elif isinstance(self.first, Lock) and isinstance(self.second, Operation):
-            return EdgeType.locking
-        elif isinstance(self.first, Operation) and isinstance(self.second, Lock):
-            return EdgeType.unlocking
-        raise MASCMException(f"Unknown type of edge: {self}")
+        if self.kind is None:
+            raise MASCMException(f"Unknown type of edge: {self}")
+        return self.kind
 
     def __repr__(self):
         return str((self.first, self.second))
 
     def __eq__(self, other):
         return (self.edge_type == other.edge_type) and (self.first == other.first) and (self.second == other.second)
+
+    def __hash__(self):
+        return hash((self.kind, self.first, self.second))
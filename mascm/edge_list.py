@@ -0,0 +1,93 @@
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from collections import defaultdict, UserList
+
+
+class EdgeList(UserList):
+    """ List of edges which also keeps edges of every kind, in order of the list """
+
+    def __init__(self, edges=None):
+        super(EdgeList, self).__init__(edges)
+        self.__by_kind = None
+        self.__version = 0
+
+    @property
+    def version(self) -> int:
+        """ Number which is changed every time when list is modified """
+        return self.__version
+
+    def of_kind(self, kind) -> list:
+        """ Method return edges of given kind
+        :param kind: EdgeType value
+        :return: List with edges, in order of the list
+        """
+        if self.__by_kind is None:
+            self.__by_kind = defaultdict(list)
+            for edge in self.data:
+                self.__by_kind[edge.kind].append(edge)
+        return self.__by_kind[kind]
+
+    def __invalidate(self) -> None:
+        """ Edges of kinds are collected again when they are needed """
+        self.__by_kind = None
+        self.__version += 1
+
+    def append(self, edge) -> None:
+        super(EdgeList, self).append(edge)
+        self.__version += 1
+        if self.__by_kind is not None:
+            self.__by_kind[edge.kind].append(edge)
+
+    def pop(self, i: int = -1):
+        edge = super(EdgeList, self).pop(i)
+        if (self.__by_kind is not None) and (i == -1):
+            self.__by_kind[edge.kind].pop()
+            self.__version += 1
+        else:
+            self.__invalidate()
+        return edge
+
+    def insert(self, i: int, edge) -> None:
+        super(EdgeList, self).insert(i, edge)
+        self.__invalidate()
+
+    def remove(self, edge) -> None:
+        super(EdgeList, self).remove(edge)
+        self.__invalidate()
+
+    def clear(self) -> None:
+        super(EdgeList, self).clear()
+        self.__invalidate()
+
+    def extend(self, edges) -> None:
+        super(EdgeList, self).extend(edges)
+        self.__invalidate()
+
+    def reverse(self) -> None:
+        super(EdgeList, self).reverse()
+        self.__invalidate()
+
+    def sort(self, *args, **kwargs) -> None:
+        super(EdgeList, self).sort(*args, **kwargs)
+        self.__invalidate()
+
+    def __setitem__(self, i, edge) -> None:
+        super(EdgeList, self).__setitem__(i, edge)
+        self.__invalidate()
+
+    def __delitem__(self, i) -> None:
+        super(EdgeList, self).__delitem__(i)
+        self.__invalidate()
+
+    def __iadd__(self, edges):
+        result = super(EdgeList, self).__iadd__(edges)
+        self.__invalidate()
+        return result
+
+    def __imul__(self, n: int):
+        result = super(EdgeList, self).__imul__(n)
+        self.__invalidate()
+        return result
@@ -47,6 +47,12 @@ class Lock:
         """
         return self.__type
 
+    def symbols(self) -> set:
+        """ Method return names under which lock is found
+        :return: Set with name
+        """
+        return {self.__name}
+
     def set_type(self, type_str: str) -> None:
         """ Method set lock type using string
         :param type_str: String with type
@@ -59,8 +65,16 @@ class Lock:
         return f"({self.name}, {type_str})"
 
     def compare(self, other):
-        """ Function created for comparing because overriding __eq__ make Locks unhashable """
-        return (self.name == other.name) and (self.type == other.type) and (self.index == other.index)
+        """ Function compare locks together with their names and types """
+        return (self == other) and (self.name == other.name) and (self.type == other.type)
+
+    def __hash__(self):
+        return hash(self.__num)
+
+    def __eq__(self, other):
+        if isinstance(other, Lock):
+            return self.__num == other.__num
+        return NotImplemented
 
     def __repr__(self):
         return f"q{self.__num}"
@@ -4,6 +4,7 @@ __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
 from collections import defaultdict, namedtuple
+from helpers.exceptions import MASCMException
 from typing import Sequence
 
 
@@ -11,9 +12,16 @@ class MultithreadedApplicationSourceCodeModel(namedtuple(
         'MASCM', ('threads', 'time_units', 'resources', 'operations', 'mutexes', 'edges', 'relations'))):
     """General class of multithreaded application source code model
     """
-    mutex_attrs = defaultdict()
-    local_resources = list()
-    struct_defs = list()
+
+    def __new__(cls, *args, **kwargs):
+        """ Ctor, every model has its own mutex attributes, local resources, struct definitions and edge index """
+        self = super(MultithreadedApplicationSourceCodeModel, cls).__new__(cls, *args, **kwargs)
+        self.mutex_attrs = defaultdict()
+        self.local_resources = list()
+        self.struct_defs = list()
+        self.context = None
+        self.edge_index = None  # Index of edges used by detectors, see helpers.time_unit_helper.get_edge_index
+        return self
 
     def __prepare_visual_fix(self, model: str, model_set: str, elements: Sequence) -> str:
         """ Function applied fixes for specified elements of model
@@ -61,5 +69,10 @@ class MultithreadedApplicationSourceCodeModel(namedtuple(
         :param mutex_name: mutex name
         :param type_name: attribute name
         """
-        mutex = next((m for m in self.q if m.name == mutex_name))
+        if self.context is not None:
+            mutex = self.context.mutexes_table.first(mutex_name)
+            if mutex is None:
+                raise MASCMException(f"Cannot find mutex: {mutex_name}")
+        else:
+            mutex = next((m for m in self.q if m.name == mutex_name))
         mutex.set_type(self.mutex_attrs[type_name])
@@ -261,5 +261,8 @@ class Operation:
     def __eq__(self, other):
         return self.__thread.index == other.__thread.index and self.__operation_number == other.__operation_number
 
+    def __hash__(self):
+        return hash((self.__thread.index, self.__operation_number))
+
     def __repr__(self):
         return "o{},{}".format(self.__thread.index, self.__operation_number)
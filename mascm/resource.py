@@ -6,13 +6,16 @@ __version__ = "1.1"
 from sortedcontainers import SortedSet
 from helpers.exceptions import MASCMException
 from helpers.mascm_helper import extract_resource_name, extract_resource_type
+from itertools import count
 import logging
 from pycparser.c_ast import *
 from typing import Optional
 
 
 class Resource:
-    """ Resource class """
+    """ Resource class, resources are identified by unique number assigned at creation """
+    __uids = count(1)
+
     def __init__(self, node, num: int = -1, names: Optional[set] = None):
         """ Ctor
         :param node: Node from code
@@ -27,12 +30,33 @@ class Resource:
 
         self.__type, self.__is_struct = extract_resource_type(node)
         self.__fields = []  # For structure
+        self.__observers = []  # Symbol tables which index this resource
+        self.__uid = next(Resource.__uids)
+
+    def add_observer(self, observer) -> None:
+        """ Add object which is notified when names or fields of resource are changed
+        :param observer: Object with update method
+        """
+        self.__observers.append(observer)
+
+    def remove_observer(self, observer) -> None:
+        """ Remove object added by add_observer method
+        :param observer: Object with update method
+        """
+        self.__observers.remove(observer)
+
+    def __notify(self) -> None:
+        """ Notify observers about change of names or fields """
+        for observer in self.__observers:
+            observer.update(self)
 
     def add_name(self, name: str):
         """ Add resource name or resource alias
         :param name: String with name
         """
-        self.__names.add(name)
+        if name not in self.__names:
+            self.__names.add(name)
+            self.__notify()
 
     def has_names(self, names) -> bool:
         """ Resource has given name or alias
@@ -61,16 +85,32 @@ class Resource:
         """ Method add fields from Struct node """
         for decl in node.decls:
             self.__fields.append(decl.name)
+        self.__notify()
 
     def add_field(self, name: str):
         """ Method to add single field name """
         self.__fields.append(name)
+        self.__notify()
+
+    def symbols(self) -> set:
+        """ Method return all names for which resource is found by in operator: names and pairs of name and field
+        joined by dot
+        :return: Set with strings
+        """
+        names = {name for name in self.__names if isinstance(name, str) and '.' not in name}
+        fields = {field for field in self.__fields if isinstance(field, str) and '.' not in field}
+        return names | {f"{name}.{field}" for name in names for field in fields}
 
     @property
     def is_struct(self) -> bool:
         """ To check resource is struct """
         return self.__is_struct
 
+    @property
+    def fields(self) -> list:
+        """ Fields of struct getter """
+        return self.__fields
+
     @property
     def names(self) -> set:
         """ All names getter """
@@ -97,12 +137,23 @@ class Resource:
                 n.add(f"{name}.{field}")
         return "{" + template.format(names=", ".join(SortedSet(self.__names))) + "}"
 
+    def __getstate__(self):
+        """ Copies of resource are not indexed by symbol tables """
+        state = self.__dict__.copy()
+        state["_Resource__observers"] = []
+        return state
+
+    @property
+    def uid(self) -> int:
+        """ Unique identifier of resource, it is kept by copies of resource """
+        return self.__uid
+
     def __hash__(self):
-        return hash(self.__node)
+        return hash(self.__uid)
 
     def __eq__(self, other):
         if isinstance(other, Resource):
-            return other.__names == self.__names
+            return other.__uid == self.__uid
         return False
 
     def __repr__(self):
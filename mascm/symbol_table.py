@@ -0,0 +1,108 @@
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from bisect import insort
+from collections import defaultdict
+from typing import Any, Callable, Hashable, Optional
+
+
+class SymbolTable:
+    """ Index of model elements by their symbols
+    Lookups give the same result as scanning elements in order in which they were added to the table. Elements which
+    can change their symbols (e.g. resources which get new aliases) notify the table about it by update method.
+    """
+
+    def __init__(self, symbols: Callable[[Any], set]):
+        """ Ctor
+        :param symbols: Function which returns set of symbols of element
+        """
+        self.__symbols = symbols
+        self.__index = defaultdict(list)  # Symbol -> list of pairs of position and element, sorted by position
+        self.__elements = dict()  # Id of element -> position of element and set of its indexed symbols
+        self.__next_position = 0
+        self.__generation = 0
+
+    @property
+    def generation(self) -> int:
+        """ Number which is changed every time when result of some lookup can change """
+        return self.__generation
+
+    def __index_symbols(self, element, position: int, symbols: set) -> None:
+        """ Method add element to index under given symbols """
+        for symbol in symbols:
+            insort(self.__index[symbol], (position, id(element), element))
+
+    def add(self, element) -> None:
+        """ Method add element to table, as last one
+        :param element: Element of model
+        """
+        position = self.__next_position
+        self.__next_position += 1
+        symbols = set(self.__symbols(element))
+        self.__elements[id(element)] = (position, symbols)
+        self.__index_symbols(element, position, symbols)
+        if hasattr(element, "add_observer"):
+            element.add_observer(self)
+        self.__generation += 1
+
+    def update(self, element) -> None:
+        """ Method index new symbols of element, it is called by element when its symbols are changed
+        :param element: Element of model
+        """
+        position, symbols = self.__elements[id(element)]
+        new_symbols = set(self.__symbols(element)) - symbols
+        if not new_symbols:
+            return
+        symbols.update(new_symbols)
+        self.__index_symbols(element, position, new_symbols)
+        self.__generation += 1
+
+    def remove(self, element) -> None:
+        """ Method remove element from table
+        :param element: Element of model
+        """
+        position, symbols = self.__elements.pop(id(element))
+        for symbol in symbols:
+            entries = self.__index[symbol]
+            entries.remove(next(entry for entry in entries if entry[0] == position))
+            if not entries:
+                del self.__index[symbol]
+        if hasattr(element, "remove_observer"):
+            element.remove_observer(self)
+        self.__generation += 1
+
+    def first(self, symbol: Optional[Hashable]):
+        """ Method return first element with given symbol
+        :param symbol: Symbol of element
+        :return: Element or None
+        """
+        entries = self.__index.get(symbol)
+        return entries[0][-1] if entries else None
+
+    def last(self, symbol: Optional[Hashable]):
+        """ Method return last element with given symbol
+        :param symbol: Symbol of element
+        :return: Element or None
+        """
+        entries = self.__index.get(symbol)
+        return entries[-1][-1] if entries else None
+
+    def __contains__(self, symbol: Optional[Hashable]) -> bool:
+        return symbol in self.__index
+
+    def __len__(self) -> int:
+        return len(self.__elements)
+
+
+def resource_symbol(item) -> Optional[str]:
+    """ Function convert name used in code to symbol of resource
+    Symbol is indexed for resource if the name is in the resource (see Resource.__contains__).
+
+    :param item: Name of resource or name of resource and its field joined by dot
+    :return: Symbol or None if the name cannot point any resource
+    """
+    if not isinstance(item, str) or item.count('.') > 1:
+        return None
+    return item
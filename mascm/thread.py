@@ -76,3 +76,6 @@ class Thread:
 
     def __eq__(self, other) -> bool:
         return (self.__name == other.__name) and (self.__thread_index == other.__thread_index)
+
+    def __hash__(self):
+        return hash(self.__thread_index)
@@ -8,13 +8,20 @@ __version__ = "1.1"
 import argparse
 from collections import deque
 import config as c
-from helpers.common import functions_pair, resource_usage
+from helpers.cache import Cache
+from helpers.compilation_database import load_compile_commands
+from helpers.common import functions_pair, positive_int, resource_usage
+from helpers.parser import get_parser, parse_texts
 from helpers.path import collect_c_project_files
-from helpers.purifier import purify_file, purify_files
+from helpers.purifier import preprocess_compile_commands, preprocess_file, preprocess_files, write_pure_file
 import logging
-from mascm import create_mascm
+from mascm import create_mascm, MultithreadedApplicationSourceCodeModel
+from mascm.create_mascm import collect_global_declarations
+from os import cpu_count
 from os.path import join, dirname
-from pycparser import parse_file
+import pycparser
+import sys
+from typing import Optional
 
 parser = argparse.ArgumentParser(description='Process AST to MASCM')
 parser.add_argument('path', type=str, help="Paths to source code")
@@ -34,25 +41,125 @@ parser.add_argument(
     nargs="+"
 )
 parser.add_argument('-r', '--resource-usage', action='store_true', help="Show resources usage")
+parser.add_argument(
+    '-j', '--jobs', type=positive_int, default=cpu_count() or 1,
+    help="Number of files preprocessed and parsed at the same time"
+)
+parser.add_argument('--cache-dir', type=str, default=c.cache_dir, help="Directory with cached artifacts of analysis")
+parser.add_argument('--no-cache', action='store_true', help="Do not use cached artifacts of analysis")
+parser.add_argument(
+    '--compile-commands', type=str, default=None,
+    help="Path to compile_commands.json file with compiler flags of every file, files outside of path are skipped"
+)
+parser.add_argument(
+    '--incremental', action='store_true', help="Reuse artifacts of translation units which did not change"
+)
+parser.add_argument('--keep-pure', action='store_true', help="Save purified code in pure files")
+
+
+def create_cache(args, namespace: str) -> Optional[Cache]:
+    """ Function create cache if it is not disabled by command line arguments
+    :param args: Parsed command line arguments
+    :param namespace: Name of cache
+    :return: Cache object or None
+    """
+    if args.no_cache:
+        return None
+    return Cache(args.cache_dir, namespace)
+
+
+def purify_sources(path: str, cflags: str = "", jobs: int = 1, purification_cache: Optional[Cache] = None,
+                   keep_pure: bool = False, compile_commands: Optional[str] = None) -> deque:
+    """Function purify C code without saving it on disk
+    Pure files are written only if keep_pure flag is set. If compilation database is given, every file placed in path
+    is purified with its own flags instead of flags guessed from project structure.
+
+    :param path: Path to source code
+    :param cflags: C compiler flags needed to compilation
+    :param jobs: Number of files preprocessed at the same time
+    :param purification_cache: Cache with purified files
+    :param keep_pure: Save purified code in pure files
+    :param compile_commands: Path to compile_commands.json file
+    :return: deque object with pairs of path to C file and purified code
+    """
+    if compile_commands is not None:
+        commands = load_compile_commands(compile_commands, path)
+        if not commands:
+            logging.critical(f"There are no files from {path} in compilation database {compile_commands}")
+            logging.critical("Terminating application")
+            sys.exit(1)
+        purified = preprocess_compile_commands(commands, cflags=cflags, jobs=jobs, cache=purification_cache)
+    else:
+        try:
+            purified = deque([(path, preprocess_file(path, cflags=cflags, cache=purification_cache))])
+        except IsADirectoryError:
+            purified = preprocess_files(
+                collect_c_project_files(path), cflags=cflags, jobs=jobs, cache=purification_cache
+            )
+    if keep_pure:
+        for file, text in purified:
+            write_pure_file(file, text)
+    return purified
 
 
-def create_ast(path: str, cflags: str = "") -> deque:
+def create_ast(path: str, cflags: str = "", jobs: int = 1, purification_cache: Optional[Cache] = None,
+               ast_cache: Optional[Cache] = None, keep_pure: bool = False,
+               compile_commands: Optional[str] = None) -> deque:
     """Function converting C code to AST
     :param path: Path to source code
     :param cflags: C compiler flags needed to compilation
+    :param jobs: Number of files preprocessed and parsed at the same time
+    :param purification_cache: Cache with purified files
+    :param ast_cache: Cache with parsed AST's
+    :param keep_pure: Save purified code in pure files
+    :param compile_commands: Path to compile_commands.json file
     :return: deque object
     """
-    try:
-        ast = deque()
-        ast.append(parse_file(purify_file(path, cflags=cflags)))
-        return ast
-    except IsADirectoryError:
-        pass
-    pure_files = purify_files(collect_c_project_files(path), cflags=cflags)
-    ast = deque()
-    for file in pure_files:
-        ast.append(parse_file(file))
-    return ast
+    purified = purify_sources(path, cflags, jobs, purification_cache, keep_pure, compile_commands)
+    return parse_texts(purified, jobs, ast_cache)
+
+
+def create_translation_units(sources: deque, jobs: int = 1, cache: Optional[Cache] = None) -> tuple:
+    """Function create AST's and global declarations of translation units
+    Artifacts of translation units whose purified code did not change since previous analysis are taken from cache,
+    only changed units are parsed again.
+
+    :param sources: Pairs of path to C file and purified code
+    :param jobs: Number of files parsed at the same time
+    :param cache: Cache with artifacts of translation units
+    :return: Tuple with deque of AST's, list with global declarations of every AST and number of reused units
+    """
+    sources = list(sources)
+    keys = [Cache.key(text, file, pycparser.__version__, "declarations") for file, text in sources]
+    units = [cache.get(key) if cache is not None else None for key in keys]
+    missing = [i for i, unit in enumerate(units) if unit is None]
+    for i, ast in zip(missing, parse_texts([sources[i] for i in missing], jobs)):
+        units[i] = (ast, collect_global_declarations(ast))
+        if cache is not None:
+            cache.put(keys[i], units[i])
+    return deque(ast for ast, _ in units), [declarations for _, declarations in units], len(sources) - len(missing)
+
+
+def create_model(args) -> MultithreadedApplicationSourceCodeModel:
+    """Function create MASCM for source code given in command line arguments
+    In incremental mode, report about reused translation units is printed to standard error, so it is not mixed with
+    model or report printed to standard output.
+
+    :param args: Parsed command line arguments
+    :return: MultithreadedApplicationSourceCodeModel object
+    """
+    get_parser(None if args.no_cache else join(args.cache_dir, "parser_tables"))
+    purification_cache = create_cache(args, "purified")
+    if not args.incremental:
+        return create_mascm(create_ast(args.path, args.cflags, args.jobs, purification_cache,
+                                       create_cache(args, "ast"), args.keep_pure, args.compile_commands))
+
+    sources = purify_sources(args.path, args.cflags, args.jobs, purification_cache, args.keep_pure,
+                             args.compile_commands)
+    asts, declarations, reused = create_translation_units(sources, args.jobs, create_cache(args, "units"))
+    print(f"Incremental analysis: artifacts of {reused} of {len(asts)} translation units reused", file=sys.stderr)
+    logging.info(f"Artifacts of {reused} of {len(asts)} translation units reused")
+    return create_mascm(asts, declarations)
 
 
 def main(args) -> None:
@@ -62,7 +169,7 @@ def main(args) -> None:
     c.relations['backward'].extend(args.backward_rel_pairs)
     c.relations['symmetric'].extend(args.symmetric_rel_pairs)
     logging.basicConfig(filename=join(dirname(__file__), "mascm_generator.log"), level=args.log_level)
-    mascm = create_mascm(create_ast(args.path, args.cflags))
+    mascm = create_model(args)
     print(mascm)
 
 
@@ -5,7 +5,10 @@ __email__ = "damian.giebas@gmail.com"
 __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
+from rdao.analysis_context import AnalysisContext
 from rdao.atomicity_violation import detect_atomicity_violation
 from rdao.deadlock import detect_deadlock
+from rdao.lock_order_deadlock import detect_deadlock_by_lock_order
+from rdao.lockset_race_condition import detect_race_condition_by_locksets
 from rdao.order_violation import detect_order_violation
 from rdao.race_condition import detect_race_condition
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3.8
+
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from collections import Counter, defaultdict, namedtuple
+from functools import cached_property
+from helpers import EdgeIndex, EdgeType, get_edge_index
+from itertools import combinations
+import logging
+from mascm import Lock, MultithreadedApplicationSourceCodeModel as MASCM, Operation, Resource
+from operator import itemgetter
+from typing import Iterable, Optional
+
+Access = namedtuple("Access", ("thread", "edge", "is_write", "locks"))
+
+
+def lock_bit(lock: Lock) -> int:
+    """ Function return bit which represents mutex in bitmask of held mutexes
+    :param lock: Lock object
+    :return: Int with single bit set
+    """
+    return 1 << lock.index
+
+
+def subgraph_thread_index(subgraph: list) -> int:
+    """ Function return index of thread, which operations are placed in subgraph
+    :param subgraph: Not empty list of edges with mutex or resource
+    :return: Int with index of thread
+    """
+    edge = subgraph[0]
+    return edge.second.thread.index if isinstance(edge.second, Operation) else edge.first.thread.index
+
+
+def thread_held_locks(thread_index: int, edges: Iterable) -> dict:
+    """ Function find mutexes held by thread during execution of its operations
+    Operation which locks or unlocks mutex holds this mutex. Mutex locked many times is held until the last unlocking.
+
+    :param thread_index: Index of thread
+    :param edges: Edges of thread in order of execution
+    :return: Dict with operation of thread and bitmask of held mutexes, with bit number equal to lock index
+    """
+    held_locks = defaultdict(int)
+    locked, mask = Counter(), 0
+    for edge in edges:
+        if edge.kind == EdgeType.locking:
+            locked[edge.first] += 1
+            mask |= lock_bit(edge.first)
+            operation = edge.second
+        elif edge.kind == EdgeType.unlocking:
+            operation = edge.first
+            if locked[edge.second]:
+                held_locks[operation] |= mask
+                locked[edge.second] -= 1
+                if not locked[edge.second]:
+                    mask &= ~lock_bit(edge.second)
+        elif edge.kind == EdgeType.dependency:
+            operation = edge.second
+        else:
+            operation = edge.first
+        if isinstance(operation, Operation) and (operation.thread.index == thread_index):
+            held_locks[operation] |= mask
+    return dict(held_locks)
+
+
+class AccessMatrix:
+    """ Matrix of accesses of threads to resources
+    Every row of matrix is stored as pair of bitsets, with reads and writes of thread. Number of bit is equal to position
+    of resource in model.
+    """
+
+    def __init__(self, resources: list, resource_accesses: dict):
+        """ Ctor
+        :param resources: List of resources of model
+        :param resource_accesses: Dict with resource and list of Access
+        """
+        self.__positions = {resource: position for position, resource in enumerate(resources)}
+        self.__reads, self.__writes = defaultdict(int), defaultdict(int)  # Thread index -> bitset of resources
+        for resource, accesses in resource_accesses.items():
+            bit = 1 << self.__positions.setdefault(resource, len(self.__positions))
+            for access in accesses:
+                row = self.__writes if access.is_write else self.__reads
+                row[access.thread.index] |= bit
+
+    def reads(self, thread_index: int) -> int:
+        """ Method return bitset of resources read by thread
+        :param thread_index: Index of thread
+        :return: Int with bitset
+        """
+        return self.__reads.get(thread_index, 0)
+
+    def writes(self, thread_index: int) -> int:
+        """ Method return bitset of resources written by thread
+        :param thread_index: Index of thread
+        :return: Int with bitset
+        """
+        return self.__writes.get(thread_index, 0)
+
+    def shares_resource(self, first: int, second: int) -> bool:
+        """ Method check threads access at least one common resource
+        :param first: Index of the first thread
+        :param second: Index of the second thread
+        :return: Boolean value
+        """
+        return bool((self.reads(first) | self.writes(first)) & (self.reads(second) | self.writes(second)))
+
+    def shares_written_resource(self, first: int, second: int) -> bool:
+        """ Method check threads access at least one common resource, which is written by any of them
+        :param first: Index of the first thread
+        :param second: Index of the second thread
+        :return: Boolean value
+        """
+        return bool((self.writes(first) & (self.reads(second) | self.writes(second))) |
+                    (self.writes(second) & self.reads(first)))
+
+
+def prepare_ignored_edges(thread_index: int, edges: list) -> list:
+    """ Function check set of edges to detect which edges should be ignored
+
+    :param thread_index: Index of thread
+    :param edges: list of all edges
+    :return: List of ignored edges
+    """
+    thread_creation = list()
+    # Set of edges which have to be ignored, because they are before pthread_create and after pthread_join
+    ignored_edges = list()
+    for edge in edges:
+        f, s = edge
+        if (isinstance(f, Operation) and f.thread.index > thread_index) or \
+                (isinstance(s, Operation) and s.thread.index > thread_index):
+            break
+        elif (isinstance(f, Operation) and f.thread.index < thread_index) or \
+                (isinstance(s, Operation) and s.thread.index < thread_index):
+            continue
+        if isinstance(f, Operation) and (f.name == "pthread_create"):
+            thread_creation.append(True)
+        elif isinstance(f, Operation) and (f.name == "pthread_join"):
+            thread_creation.pop()
+        if not thread_creation:
+            ignored_edges.append(edge)
+    return ignored_edges
+
+
+def group_operations_by_critical_section(graph: list, held_locks: dict) -> dict:
+    """ Function is responsible for group operations by critical_sections
+    Critical section is started by locking made when thread holds no mutex. Every operation is stored together with
+    bitmask of mutexes held during its execution.
+
+    :param graph: List of edges of single thread
+    :param held_locks: Dict with operation and bitmask of mutexes held during its execution
+    :return: Dict with critical section number and list of operations
+    """
+    critical_sections_operations = defaultdict(list)
+    held_mask = 0  # Mutexes held after the last locking or unlocking
+    critical_section_number = 0
+    for edge in graph:
+        if edge.kind == EdgeType.locking:
+            if not held_mask:
+                critical_section_number += 1
+            held_mask = held_locks.get(edge.second, 0)
+            continue
+        elif edge.kind == EdgeType.unlocking:
+            held_mask = held_locks.get(edge.first, 0)
+            if not held_mask & lock_bit(edge.second):
+                logging.warning(f'Held mutexes: {held_mask:b} does not contains second element of {edge}')
+            held_mask &= ~lock_bit(edge.second)
+            continue
+        if held_mask:
+            if edge.kind == EdgeType.usage:
+                critical_sections_operations[critical_section_number].append(
+                    (edge.first, edge.second, held_locks.get(edge.first, 0), edge)
+                )
+            elif edge.kind == EdgeType.dependency:
+                critical_sections_operations[critical_section_number].append(
+                    (edge.second, edge.first, held_locks.get(edge.second, 0), edge)
+                )
+    return critical_sections_operations
+
+
+class CriticalSectionIndex:
+    """ Index of operations of subgraph grouped by critical sections
+    Index allow to find operations of critical sections by operation and accesses of named operations by resource.
+    """
+
+    def __init__(self, graph: list, held_locks: Optional[dict] = None):
+        """ Ctor
+        :param graph: Not empty list of edges with mutex or resource
+        :param held_locks: Dict with operation and bitmask of held mutexes, found in graph if not given
+        """
+        if held_locks is None:
+            held_locks = thread_held_locks(subgraph_thread_index(graph), graph)
+        self.sections = group_operations_by_critical_section(graph, held_locks)
+        self.__section_operations = defaultdict(list)  # Operation -> position and operation of critical section
+        position = 0
+        for section_ops in self.sections.values():
+            for section_op in section_ops:
+                self.__section_operations[section_op[0]].append((position, section_op))
+                position += 1
+        self.__accesses = defaultdict(list)  # Resource -> edges of named operations which use resource
+        for edge in graph:
+            # Checking name is needed to distinguish user function call and language built-in function
+            if edge.kind == EdgeType.usage and edge.first.name:
+                self.__accesses[edge.second].append(edge)
+            elif edge.kind == EdgeType.dependency and edge.second.name:
+                self.__accesses[edge.first].append(edge)
+
+    def split_sections(self, first_operation: Operation, second_operation: Operation) -> list:
+        """ Method return operations of critical sections which are one of given operations, but not both of them
+        :param first_operation: Operation object
+        :param second_operation: Operation object
+        :return: List of operations of critical sections, in order of critical sections
+        """
+        if first_operation == second_operation:
+            return []
+        section_ops = self.__section_operations.get(first_operation, []) + \
+            self.__section_operations.get(second_operation, [])
+        return [section_op for _, section_op in sorted(section_ops, key=itemgetter(0))]
+
+    def accesses(self, resource: Resource) -> list:
+        """ Method return edges of named operations which use or depend on resource
+        :param resource: Resource object
+        :return: List of edges in order of subgraph
+        """
+        return self.__accesses.get(resource, [])
+
+
+class AnalysisContext:
+    """ Views of MASCM shared by detectors, every view is computed when it is used for the first time
+    Model cannot be modified after creation of context.
+    """
+
+    def __init__(self, mascm: MASCM):
+        """ Ctor
+        :param mascm: MultithreadedApplicationSourceCodeModel object
+        """
+        self.__mascm = mascm
+        self.__critical_section_indexes = dict()  # Id of graph -> graph and index of its critical sections
+        self.__ignored_edges = dict()  # Thread index -> edges of thread made outside of creation and joining of threads
+
+    @property
+    def mascm(self) -> MASCM:
+        """ Analysed model """
+        return self.__mascm
+
+    @cached_property
+    def edge_index(self) -> EdgeIndex:
+        """ Index of model edges by threads """
+        return get_edge_index(self.__mascm)
+
+    @cached_property
+    def multithreaded_time_units(self) -> list:
+        """ Time units with more than one thread """
+        return [unit for unit in self.__mascm.time_units if len(unit) > 1]
+
+    @cached_property
+    def unique_multithreaded_time_units(self) -> list:
+        """ Time units with more than one thread, without repeated time units """
+        time_units, known_units = list(), set()
+        for unit in self.multithreaded_time_units:
+            if tuple(unit) not in known_units:
+                known_units.add(tuple(unit))
+                time_units.append(unit)
+        return time_units
+
+    def __threads_edges(self, time_units: list):
+        """ Generator of edges of every thread in graphs of given time units
+        :param time_units: List of time units
+        :return: Generator of time unit, thread and list of edges of thread from time unit graph
+        """
+        graphs = self.edge_index.time_units_graphs(time_units)  # Build full graphs for every time unit
+        for unit in time_units:
+            edges = graphs[str(unit)]
+            for thread in unit:
+                yield unit, thread, [edge for edge in edges if self.edge_index.is_edge_of_thread(edge, thread)]
+
+    @staticmethod
+    def __resource_subgraph(thread_edges: list) -> list:
+        """ Method select edges with mutex or resource """
+        kinds = (EdgeType.locking, EdgeType.unlocking, EdgeType.dependency, EdgeType.usage)
+        return [edge for edge in thread_edges if edge.kind in kinds]
+
+    @cached_property
+    def race_condition_subgraphs(self) -> dict:
+        """ Subgraphs of threads for every unique multithreaded time unit, which contain edges with mutex or resource
+        """
+        subgraphs = defaultdict(list)
+        for unit, thread, thread_edges in self.__threads_edges(self.unique_multithreaded_time_units):
+            if not thread_edges:
+                logging.debug(f"Unexpected situation for thread no. {thread.index} in time unit {unit}")
+                continue
+            subgraphs[str(unit)].append(self.__resource_subgraph(thread_edges))
+        return subgraphs
+
+    @cached_property
+    def atomicity_violation_subgraphs(self) -> list:
+        """ Not empty subgraphs of threads for every multithreaded time unit, which contain edges with mutex or
+        resource
+        """
+        subgraphs = list()
+        for unit, thread, thread_edges in self.__threads_edges(self.multithreaded_time_units):
+            if not thread_edges:
+                raise ValueError(f"Unexpected situation for thread no. {thread.index} in time unit {unit}")
+            subgraph = self.__resource_subgraph(thread_edges)
+            if subgraph:
+                subgraphs.append(subgraph)
+        return subgraphs
+
+    @cached_property
+    def mutex_collections(self) -> list:
+        """ Not empty lists of lock and unlock edges of threads for every time unit """
+        mutex_collections = list()
+        for unit, thread, thread_edges in self.__threads_edges(self.__mascm.time_units):
+            if not thread_edges:
+                logging.debug(f"Unexpected situation for thread no. {thread.index} in time unit {unit}")
+                continue
+            collection = [edge for edge in thread_edges if edge.kind in (EdgeType.locking, EdgeType.unlocking)]
+            if collection:
+                mutex_collections.append(collection)
+        return mutex_collections
+
+    def critical_section_index(self, graph: list) -> CriticalSectionIndex:
+        """ Method return index of critical sections of graph
+        :param graph: List of edges, one of subgraphs of context
+        :return: CriticalSectionIndex object
+        """
+        if id(graph) not in self.__critical_section_indexes:
+            self.__critical_section_indexes[id(graph)] = (graph, CriticalSectionIndex(graph, self.held_locks))
+        return self.__critical_section_indexes[id(graph)][1]
+
+    def critical_sections(self, graph: list) -> dict:
+        """ Method return operations of graph grouped by critical sections
+        :param graph: List of edges, one of subgraphs of context
+        :return: Dict with critical section number and list of operations
+        """
+        return self.critical_section_index(graph).sections
+
+    def ignored_edges(self, thread_index: int) -> frozenset:
+        """ Method return edges of thread which are made before creation or after joining of other threads
+        :param thread_index: Index of thread
+        :return: Frozenset with edges
+        """
+        if thread_index not in self.__ignored_edges:
+            self.__ignored_edges[thread_index] = frozenset(prepare_ignored_edges(thread_index, self.__mascm.edges))
+        return self.__ignored_edges[thread_index]
+
+    @cached_property
+    def concurrent_threads(self) -> set:
+        """ Pairs of indexes of threads which are placed in the same multithreaded time unit """
+        pairs = set()
+        for unit in self.unique_multithreaded_time_units:
+            for t1, t2 in combinations(unit, 2):
+                if t1.index != t2.index:
+                    pairs.add(frozenset((t1.index, t2.index)))
+        return pairs
+
+    @cached_property
+    def held_locks(self) -> dict:
+        """ Mutexes held during execution of every operation, stored as bitmask with bit number equal to lock index
+        Operation which locks or unlocks mutex holds this mutex.
+        """
+        held_locks = dict()
+        for thread in self.__mascm.threads:
+            held_locks.update(thread_held_locks(thread.index, self.edge_index.thread_edges(thread)))
+        return held_locks
+
+    @cached_property
+    def resource_accesses(self) -> dict:
+        """ Accesses to every resource, with bitmask of mutexes locked by thread during access
+        Usage edges are writes and dependency edges are reads of resource.
+        """
+        accesses = defaultdict(list)
+        for thread in self.__mascm.threads:
+            for edge in self.edge_index.thread_edges(thread):
+                if edge.kind not in (EdgeType.usage, EdgeType.dependency):
+                    continue
+                operation = edge.first if edge.kind == EdgeType.usage else edge.second
+                if not (isinstance(operation, Operation) and operation.thread.index == thread.index):
+                    continue
+                resource = edge.second if edge.kind == EdgeType.usage else edge.first
+                accesses[resource].append(Access(thread, edge, edge.kind == EdgeType.usage,
+                                                 self.held_locks[operation]))
+        return accesses
+
+    @cached_property
+    def access_matrix(self) -> AccessMatrix:
+        """ Matrix of reads and writes of resources made by every thread """
+        return AccessMatrix(self.__mascm.resources, self.resource_accesses)
+
+    @cached_property
+    def operation_resource_edges(self) -> dict:
+        """ Resources used by every operation or on which operation depends, with edges in order of model edges """
+        operation_edges = defaultdict(list)
+        for edge in self.__mascm.edges:
+            if edge.kind == EdgeType.usage:
+                operation_edges[edge.first].append((edge.second, edge))
+            elif edge.kind == EdgeType.dependency:
+                operation_edges[edge.second].append((edge.first, edge))
+        return operation_edges
+
+    @cached_property
+    def relation_pairs(self) -> list:
+        """ Pairs of operations in forward, backward and symmetric relations """
+        relations = self.__mascm.relations
+        return relations.forward + relations.backward + relations.symmetric
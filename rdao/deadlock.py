@@ -5,12 +5,14 @@ __email__ = "damian.giebas@gmail.com"
 __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
-from helpers import DeadlockType, get_time_units_graphs, expressions as e, LockType
+from collections import defaultdict
+from helpers import DeadlockType, EdgeType, LockType
+from helpers.rdao_helper import get_edges_of_kind
 from itertools import combinations, chain
 import logging
 from mascm import MultithreadedApplicationSourceCodeModel as MASCM, Thread, Lock
-import re
-from typing import Iterable, Sequence
+from rdao.analysis_context import AnalysisContext
+from typing import Iterable, Optional, Sequence
 from types import coroutine
 
 
@@ -22,9 +24,9 @@ def collect_mutexes_indexes(edges: Iterable) -> Sequence:
     """
     collection = list()
     for edge in edges:
-        if re.match(e.mutex_lock_edge_exp, str(edge)):
+        if edge.kind == EdgeType.locking:
             collection.append((edge.first.index, edge))
-        elif re.match(e.mutex_unlock_edge_exp, str(edge)):
+        elif edge.kind == EdgeType.unlocking:
             collection.append((-edge.second.index, edge))
     return collection
 
@@ -51,10 +53,7 @@ def get_all_pairs_indexes(collection: Iterable) -> Sequence:
             locks.add((value, collection[index+1]))
 
     # Build real chain of locking operation from found pairs
-    collection = list()
-    for n in chain(*locks):
-        if n not in collection:
-            collection.append(n)
+    collection = list(dict.fromkeys(chain(*locks)))
     # Return all locks combinations which can cause deadlock
     return list(combinations(collection, 2))
 
@@ -67,7 +66,7 @@ def mutually_exclusive_pairs_of_mutex(first: Sequence, second: Sequence) -> coro
         return
 
     first_locking_pairs = get_all_pairs_indexes((index for index, _ in f_pairs if index))
-    second_locking_pairs = get_all_pairs_indexes((index for index, _ in s_pairs if index))
+    second_locking_pairs = set(get_all_pairs_indexes((index for index, _ in s_pairs if index)))
 
     conflicted_pairs = list()
     for pair in first_locking_pairs:
@@ -121,29 +120,44 @@ def double_locks(mutex_collections: Sequence) -> coroutine:
             if not release_edge.first.is_loop_body_operation:
                 yield [edge]  # To be compatible with output mechanism
     mutex_numbers = list((index for index, _ in pairs))
-    mutex_indices = list((i for i, _ in enumerate(mutex_numbers)))
-    for num, index in zip(mutex_numbers, mutex_indices):
-        num_slices = mutex_numbers[index+1:]
-        if num not in num_slices:
+    # Position of the next occurrence of mutex number after every position, found in one backward pass
+    next_positions, next_position = [None] * len(mutex_numbers), dict()
+    opposite_positions = [None] * len(mutex_numbers)
+    for index in range(len(mutex_numbers) - 1, -1, -1):
+        num = mutex_numbers[index]
+        next_positions[index] = next_position.get(num)
+        opposite_positions[index] = next_position.get(-num)
+        next_position[num] = index
+    for index, num in enumerate(mutex_numbers):
+        if next_positions[index] is None:
             continue
-        _, *other_nums = mutex_numbers[index:]
-        r = other_nums.index(num)
-        num_slices = other_nums[:r]
+        # Mutex is locked (unlocked) again without unlocking (locking) it between
+        is_not_released = (opposite_positions[index] is None) or (opposite_positions[index] >= next_positions[index])
         # Second condition is checked because sometimes deadlock is reported for set which contain only 1 element
-        if (-num not in num_slices) and (len(mutex_collections[other_nums[r]]) > 1) and \
+        if is_not_released and (len(mutex_collections[num]) > 1) and \
                 isinstance(mutex_collections[index].first, Lock):  # Second condition need tests
-            yield mutex_collections[index], mutex_collections[other_nums[r]]
+            yield mutex_collections[index], mutex_collections[num]
 
 
 def recursion_locks(thread: Thread, edges: list) -> coroutine:
     """ Function is responsible for detect not PMR locks in recursion function """
     results = list()
+    transition_edges = defaultdict(list)  # Operation -> transition edges from operation
+    for edge in get_edges_of_kind(edges, EdgeType.transition):
+        transition_edges[edge.first].append(edge)
+    lock_edges = dict()  # Operation -> first edge which locks mutex in operation
+    for edge in get_edges_of_kind(edges, EdgeType.locking):
+        lock_edges.setdefault(edge.second, edge)
+    edges_positions = dict()
+    for i, edge in enumerate(edges):
+        if edge.kind == EdgeType.transition:
+            edges_positions.setdefault(edge, i)
+    operations_positions = dict()
+    for i, operation in enumerate(thread.operations):
+        operations_positions.setdefault(operation, i)
+
     for operation in thread.operations:
-        try:
-            op_edges = list(edge for edge in edges if (re.match(e.transition_edge_exp, str(edge))) and
-                            (edge.first == operation))
-        except StopIteration:
-            continue
+        op_edges = transition_edges.get(operation, [])
 
         # There is no pair which contains return operation in recursion function
         if len(op_edges) < 2:
@@ -151,7 +165,7 @@ def recursion_locks(thread: Thread, edges: list) -> coroutine:
 
         logging.debug("Checking combinations")
         for edge1, edge2 in combinations(op_edges, 2):
-            e1_index, e2_index = edges.index(edge1), edges.index(edge2)
+            e1_index, e2_index = edges_positions[edge1], edges_positions[edge2]
 
             # Pair has operations of two different threads
             if (edge1.first.thread != edge1.second.thread) or (edge2.first.thread != edge2.second.thread):
@@ -163,16 +177,14 @@ def recursion_locks(thread: Thread, edges: list) -> coroutine:
             if (edge1.first.index < edge1.second.index) or (edge2.first.index > edge2.second.index):
                 continue
 
-            so_index = thread.operations.index(edge1.second)
-            fo_index = thread.operations.index(edge1.first)
+            so_index = operations_positions[edge1.second]
+            fo_index = operations_positions[edge1.first]
 
             # Between recursion call and return should be operation locking correct mutex
             logging.debug("Checking mutexes are locked again")
             for o in thread.operations[so_index:fo_index]:
-                try:
-                    lock_edge = next(edge for edge in edges if (re.match(e.mutex_lock_edge_exp, str(edge))) and
-                                     (edge.second == o))
-                except StopIteration:
+                lock_edge = lock_edges.get(o)
+                if lock_edge is None:
                     continue
                 if lock_edge.first.type != LockType.PMR:
                     results.append((edge1, lock_edge))
@@ -183,37 +195,33 @@ def recursion_locks(thread: Thread, edges: list) -> coroutine:
             yield result
 
 
-def detect_deadlock(mascm: MASCM) -> coroutine:
-    """ Function is responsible for detecting deadlocks using MASCM """
-    logging.debug("Start detecting deadlocks")
-    time_units = mascm.time_units
-
-    graphs = get_time_units_graphs(time_units, mascm.edges)  # Build full graphs for every time unit
-
-    mutex_collections = list()
-    for unit in time_units:
-        edges = graphs[str(unit)]
-        for thread_num in (mascm.threads.index(thread) for thread in unit):
-            thread_edges = [edge for edge in edges if f"o{thread_num}" in str(edge)]
-            if not thread_edges:
-                logging.debug(f"Unexpected situation for thread no. {thread_num} in time unit {unit}")
-                continue
-
-            collection = list()
-            for edge in thread_edges:
-                if re.match(e.mutex_lock_edge_exp, str(edge)):
-                    collection.append(edge)
-                elif re.match(e.mutex_unlock_edge_exp, str(edge)):
-                    collection.append(edge)
-            if collection:
-                mutex_collections.append(collection)
+def detect_deadlock(mascm: MASCM, context: Optional[AnalysisContext] = None) -> coroutine:
+    """ Function is responsible for detecting deadlocks using MASCM
 
-    if time_units:
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param context: AnalysisContext object shared with other detectors, created if not given
+    """
+    logging.debug("Start detecting deadlocks")
+    if context is None:
+        context = AnalysisContext(mascm)
+    if mascm.time_units:
         logging.debug("Start detecting mutually exclusive pairs of mutex")
-        for s1, s2 in combinations(mutex_collections, 2):
+        for s1, s2 in combinations(context.mutex_collections, 2):
             for pair in mutually_exclusive_pairs_of_mutex(s1, s2):
                 yield DeadlockType.exclusion_lock, pair
 
+    yield from detect_lock_misuses(mascm, context)
+
+
+def detect_lock_misuses(mascm: MASCM, context: AnalysisContext) -> coroutine:
+    """ Function is responsible for detecting deadlocks caused by missing unlocks, double locks and incorrect type of
+    mutex locked in recursion
+
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param context: AnalysisContext object shared with other detectors
+    """
+    mutex_collections = context.mutex_collections
+    if mascm.time_units:
         logging.debug("Start detecting missing unlock")
         for mutex_collection in mutex_collections:
             for edge in missing_unlock(mutex_collection):
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3.8
+
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from collections import defaultdict, deque, namedtuple
+from helpers import DeadlockType, EdgeType
+import logging
+from mascm import MultithreadedApplicationSourceCodeModel as MASCM, Lock
+from rdao.analysis_context import AnalysisContext, lock_bit
+from rdao.deadlock import detect_lock_misuses
+from typing import Optional
+from types import coroutine
+
+LockOrder = namedtuple("LockOrder", ("thread", "held_edge", "acquire_edge", "held"))
+
+
+class LockOrderGraph:
+    """ Graph of order in which mutexes are locked by threads
+    Graph has an edge from mutex A to mutex B if any thread locks B while it holds A. Every edge is annotated with
+    threads, locking edges of MASCM which created it and bitmask of other mutexes held by thread during locking of B.
+    """
+
+    def __init__(self):
+        """ Ctor """
+        self.__successors = dict()  # Mutex -> dict of successors, which is used as ordered set
+        self.__orders = defaultdict(list)  # Pair of mutexes -> list of LockOrder
+
+    @property
+    def mutexes(self) -> list:
+        """ Mutexes in order of adding """
+        return list(self.__successors)
+
+    def successors(self, mutex: Lock) -> list:
+        """ Mutexes locked while given mutex is held
+        :param mutex: Lock object
+        :return: List of mutexes
+        """
+        return list(self.__successors.get(mutex, ()))
+
+    def orders(self, first: Lock, second: Lock) -> list:
+        """ Method return annotations of edge between mutexes
+        :param first: Held mutex
+        :param second: Locked mutex
+        :return: List of LockOrder
+        """
+        return self.__orders.get((first, second), [])
+
+    def add_mutex(self, mutex: Lock):
+        """ Method add mutex to graph
+        :param mutex: Lock object
+        """
+        self.__successors.setdefault(mutex, dict())
+
+    def add_order(self, order: LockOrder):
+        """ Method add edge between mutexes locked by edges of given order
+        :param order: LockOrder object
+        """
+        first, second = order.held_edge.first, order.acquire_edge.first
+        self.add_mutex(first)
+        self.add_mutex(second)
+        self.__successors[first][second] = None
+        self.__orders[(first, second)].append(order)
+
+    def strongly_connected_components(self) -> list:
+        """ Method find strongly connected components of graph using iterative Tarjan algorithm
+        :return: List of components with more than one mutex
+        """
+        indexes, low_links = dict(), dict()
+        stack, on_stack = list(), set()
+        components = list()
+        for root in self.__successors:
+            if root in indexes:
+                continue
+            work = [(root, iter(self.__successors[root]))]
+            indexes[root] = low_links[root] = len(indexes)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, successors = work[-1]
+                for successor in successors:
+                    if successor not in indexes:
+                        indexes[successor] = low_links[successor] = len(indexes)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(self.__successors[successor])))
+                        break
+                    if successor in on_stack:
+                        low_links[node] = min(low_links[node], indexes[successor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low_links[parent] = min(low_links[parent], low_links[node])
+                    if low_links[node] == indexes[node]:
+                        component = list()
+                        while True:
+                            mutex = stack.pop()
+                            on_stack.remove(mutex)
+                            component.append(mutex)
+                            if mutex == node:
+                                break
+                        if len(component) > 1:
+                            components.append(component[::-1])
+        return components
+
+    def __shortest_paths(self, source: Lock, component: set) -> dict:
+        """ Method find the shortest paths from mutex to every mutex of the same component using BFS
+        :param source: First mutex of paths
+        :param component: Set of mutexes which can be placed in paths
+        :return: Dict with mutex and its predecessor on the shortest path, source has None predecessor
+        """
+        previous = {source: None}
+        queue = deque([source])
+        while queue:
+            mutex = queue.popleft()
+            for successor in self.__successors[mutex]:
+                if (successor in component) and (successor not in previous):
+                    previous[successor] = mutex
+                    queue.append(successor)
+        return previous
+
+    def cycles(self) -> coroutine:
+        """ Generator of cycles of graph
+        For every edge of strongly connected component the shortest cycle which contains this edge is returned, every
+        cycle is returned once. Paths are searched once per mutex which is the end of any edge, so cost is
+        O(V * (V + E)) for component with V mutexes and E edges.
+
+        :return: Generator of lists of mutexes, the last mutex is followed by the first one
+        """
+        for component in self.strongly_connected_components():
+            members, known_cycles = set(component), set()
+            paths = dict()  # Mutex -> predecessors on the shortest paths from mutex
+            for mutex in component:
+                for successor in self.__successors[mutex]:
+                    if successor not in members:
+                        continue
+                    if successor not in paths:
+                        paths[successor] = self.__shortest_paths(successor, members)
+                    previous, cycle = paths[successor], [mutex]
+                    while previous[cycle[-1]] is not None:
+                        cycle.append(previous[cycle[-1]])
+                    cycle = cycle[:1] + cycle[:0:-1]
+                    key = frozenset(zip(cycle, cycle[1:] + cycle[:1]))
+                    if key not in known_cycles:
+                        known_cycles.add(key)
+                        yield cycle
+
+
+def create_lock_order_graph(mascm: MASCM, context: AnalysisContext) -> LockOrderGraph:
+    """ Function create graph of order of locking mutexes by all threads of model
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param context: AnalysisContext object
+    :return: LockOrderGraph object
+    """
+    graph = LockOrderGraph()
+    for thread in mascm.threads:
+        held = dict()  # Mutex -> edge which locked the mutex
+        for edge in context.edge_index.thread_edges(thread):
+            if edge.kind == EdgeType.locking:
+                mutex = edge.first
+                held_mask = context.held_locks[edge.second] & ~lock_bit(mutex)
+                for held_mutex, held_edge in held.items():
+                    if held_mutex != mutex:
+                        graph.add_order(LockOrder(thread, held_edge, edge, held_mask))
+                graph.add_mutex(mutex)
+                held.setdefault(mutex, edge)
+            elif edge.kind == EdgeType.unlocking:
+                held.pop(edge.second, None)
+    return graph
+
+
+def select_orders(graph: LockOrderGraph, cycle: list, concurrent_threads: set) -> Optional[list]:
+    """ Function select for every edge of cycle locking made by different, concurrent thread
+    Threads of selected lockings cannot hold common mutex, because such mutex guards cycle against deadlock. Only
+    the first locking of every thread with the same held mutexes is a candidate for edge, because other ones can be
+    selected in the same cases. Selection is searched by backtracking, which is exponential in length of cycle in the
+    worst case, so after every choice search is cut if any of next edges has no candidate left.
+
+    :param graph: LockOrderGraph object
+    :param cycle: List of mutexes
+    :param concurrent_threads: Set of pairs of indexes of threads which can work concurrently
+    :return: List of LockOrder for every edge of cycle or None if such selection does not exist
+    """
+    candidates = list()
+    for pair in zip(cycle, cycle[1:] + cycle[:1]):
+        orders = dict()  # Thread index and held mutexes -> the first LockOrder
+        for order in graph.orders(*pair):
+            orders.setdefault((order.thread.index, order.held), order)
+        candidates.append(list(orders.values()))
+    selected = list()
+
+    def is_compatible(order: LockOrder) -> bool:
+        index = order.thread.index
+        return not any((index == other.thread.index) or (order.held & other.held) or
+                       (frozenset((index, other.thread.index)) not in concurrent_threads) for other in selected)
+
+    def select(position: int) -> bool:
+        if position == len(candidates):
+            return True
+        for order in candidates[position]:
+            if not is_compatible(order):
+                continue
+            selected.append(order)
+            if all(any(is_compatible(other) for other in orders) for orders in candidates[position + 1:]) and \
+                    select(position + 1):
+                return True
+            selected.pop()
+        return False
+
+    return selected if select(0) else None
+
+
+def detect_deadlock_by_lock_order(mascm: MASCM, context: Optional[AnalysisContext] = None) -> coroutine:
+    """ Function is responsible for detecting deadlocks using graph of order of locking mutexes
+    Mutually exclusive locks are found as cycles of lock order graph, in which every edge is made by another thread
+    and all these threads can work concurrently. Other causes of deadlocks are detected in the same way as in
+    detect_deadlock function.
+
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param context: AnalysisContext object shared with other detectors, created if not given
+    """
+    logging.debug("Start detecting deadlocks using lock order graph")
+    if context is None:
+        context = AnalysisContext(mascm)
+
+    if mascm.time_units:
+        logging.debug("Start detecting cycles in lock order graph")
+        graph = create_lock_order_graph(mascm, context)
+        for cycle in graph.cycles():
+            orders = select_orders(graph, cycle, context.concurrent_threads)
+            if orders is not None:
+                yield DeadlockType.exclusion_lock, [[order.held_edge, order.acquire_edge] for order in orders]
+
+    yield from detect_lock_misuses(mascm, context)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3.8
+
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from collections import defaultdict
+from itertools import combinations
+from mascm import MultithreadedApplicationSourceCodeModel as MASCM
+from rdao.analysis_context import AnalysisContext
+from types import coroutine
+from typing import Optional
+
+
+def detect_race_condition_by_locksets(mascm: MASCM, context: Optional[AnalysisContext] = None) -> coroutine:
+    """ Function is responsible for detecting race conditions using sets of locked mutexes
+    Two accesses to the same resource are in race condition if they are made by threads from the same time unit, at
+    least one of them writes resource and threads do not hold common mutex during accesses. Accesses of thread made
+    before creation or after joining of threads with greater depth are not compared with accesses of these threads.
+
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param context: AnalysisContext object shared with other detectors, created if not given
+    """
+    if context is None:
+        context = AnalysisContext(mascm)
+    concurrent_threads = context.concurrent_threads
+    if not concurrent_threads:
+        return None
+
+    def is_ignored(access, other) -> bool:
+        """ Access of thread is ignored if thread is not as deep as thread of the other access """
+        if access.thread.depth >= other.thread.depth:
+            return False
+        return access.edge in context.ignored_edges(access.thread.index)
+
+    access_matrix = context.access_matrix
+    reported = set()
+    for resource, accesses in context.resource_accesses.items():
+        if not any(access.is_write for access in accesses):  # Resource which is only read cannot be in race condition
+            continue
+        threads_accesses = defaultdict(list)
+        for access in accesses:
+            threads_accesses[access.thread.index].append(access)
+        for t1, t2 in combinations(threads_accesses, 2):
+            # Threads without common resource written by any of them cannot be in race condition
+            if (frozenset((t1, t2)) not in concurrent_threads) or not access_matrix.shares_written_resource(t1, t2):
+                continue
+            for a1 in threads_accesses[t1]:
+                for a2 in threads_accesses[t2]:
+                    if (not (a1.is_write or a2.is_write)) or (a1.locks & a2.locks):
+                        continue
+                    if is_ignored(a1, a2) or is_ignored(a2, a1):
+                        continue
+                    reported.update((a1.edge, a2.edge))
+
+    for edge in mascm.edges:
+        if edge in reported:
+            reported.remove(edge)
+            yield edge
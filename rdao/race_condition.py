@@ -5,20 +5,21 @@ __email__ = "damian.giebas@gmail.com"
 __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
-from collections import defaultdict
-from helpers import get_time_units_graphs, expressions as e
+from helpers import EdgeType
 from itertools import combinations
 import logging
 from mascm import MultithreadedApplicationSourceCodeModel as MASCM, Operation
-import re
+from rdao.analysis_context import AnalysisContext
 from types import coroutine
+from typing import Iterable, Optional
 
 
 class GraphComparator:
     """ Object of this class allow to compare two subgraphs """
-    def __init__(self, first: list, second: list, ignored_edges: list = []):
+    def __init__(self, first: list, second: list, ignored_edges: Iterable = frozenset()):
         self.first, self.second = first, second
         self.ignored_edges = ignored_edges
+        self.__ignored_edges = ignored_edges if isinstance(ignored_edges, (set, frozenset)) else set(ignored_edges)
 
     def locate_race_condition(self) -> list:
         """ Method detect operations casing race condition
@@ -35,23 +36,23 @@ class GraphComparator:
         for index, edges in enumerate((self.first, self.second)):
             possible_race_condition = True
             for edge in edges:
-                if edge in self.ignored_edges:
+                if edge in self.__ignored_edges:
                     continue
-                if re.match(e.mutex_lock_edge_exp, str(edge)):
+                if edge.kind == EdgeType.locking:
                     possible_race_condition = False
                     graphs[index].append(edge)
                     locks[index].append(edge.first)
-                elif re.match(e.mutex_unlock_edge_exp, str(edge)):
+                elif edge.kind == EdgeType.unlocking:
                     possible_race_condition = True
                     graphs[index].append(edge)
                     locks[index].append(edge.second)
-                elif re.match(e.usage_edge_exp, str(edge)):
+                elif edge.kind == EdgeType.usage:
                     graphs[index].append(edge)
                     resources[index].append(edge.second)
                     resource_edges[index].append(edge)
                     if possible_race_condition:
                         possible_conflicts.append(edge)
-                elif re.match(e.dependency_edge_exp, str(edge)):
+                elif edge.kind == EdgeType.dependency:
                     graphs[index].append(edge)
                     resources[index].append(edge.first)
                     resource_edges[index].append(edge)
@@ -78,65 +79,21 @@ class GraphComparator:
         return (self.first is not None) and (self.second is not None)
 
 
-def prepare_ignored_edges(thread_index: int, edges: list) -> list:
-    """ Function check set of edges to detect which edges should be ignored
+def detect_race_condition(mascm: MASCM, context: Optional[AnalysisContext] = None) -> coroutine:
+    """ Function is responsible for detecting race conditions using MASCM
 
-    :param thread_index: Index of thread
-    :param edges: list of all edges
-    :return: List of ignored edges
+    :param mascm: MultithreadedApplicationSourceCodeModel object
+    :param context: AnalysisContext object shared with other detectors, created if not given
     """
-    thread_creation = list()
-    # Set of edges which have to be ignored, because they are before pthread_create and after pthread_join
-    ignored_edges = list()
-    for edge in edges:
-        f, s = edge
-        if (isinstance(f, Operation) and f.thread.index > thread_index) or \
-                (isinstance(s, Operation) and s.thread.index > thread_index):
-            break
-        elif (isinstance(f, Operation) and f.thread.index < thread_index) or \
-                (isinstance(s, Operation) and s.thread.index < thread_index):
-            continue
-        if isinstance(f, Operation) and (f.name == "pthread_create"):
-            thread_creation.append(True)
-        elif isinstance(f, Operation) and (f.name == "pthread_join"):
-            thread_creation.pop()
-        if not thread_creation:
-            ignored_edges.append(edge)
-    return ignored_edges
-
-
-def detect_race_condition(mascm: MASCM) -> coroutine:
-    """ Function is responsible for detecting race conditions using MASCM """
+    if context is None:
+        context = AnalysisContext(mascm)
     # Do not check units with one thread only
     # Also remove redundant time units
-    cond = lambda unit, tu, i: (unit not in tu[:i]) and (len(unit) > 1)
-    time_units = [unit for i, unit in enumerate(mascm.time_units) if cond(unit, mascm.time_units, i)]
-    if not time_units:
+    if not context.unique_multithreaded_time_units:
         return None
 
-    graphs = get_time_units_graphs(time_units, mascm.edges)  # Build full graphs for every time unit
-    subgraphs = defaultdict(list)
-    for unit in time_units:
-        edges = graphs[str(unit)]
-        for thread_num in (mascm.threads.index(thread) for thread in unit):
-            thread_edges = [edge for edge in edges if f"o{thread_num}" in str(edge)]
-            if not thread_edges:
-                logging.debug(f"Unexpected situation for thread no. {thread_num} in time unit {unit}")
-                continue
-
-            subgraph = list()
-            for edge in thread_edges:
-                if re.match(e.mutex_lock_edge_exp, str(edge)):
-                    subgraph.append(edge)
-                elif re.match(e.mutex_unlock_edge_exp, str(edge)):
-                    subgraph.append(edge)
-                elif re.match(e.dependency_edge_exp, str(edge)):
-                    subgraph.append(edge)
-                elif re.match(e.usage_edge_exp, str(edge)):
-                    subgraph.append(edge)
-            subgraphs[str(unit)].append(subgraph)
-
-    reported_op = list()
+    subgraphs = context.race_condition_subgraphs
+    reported_op = set()
     for _, tu_subraphs in subgraphs.items():
         for s1, s2 in combinations(tu_subraphs, 2):
             # Dirty hack to get threads of indexes
@@ -144,13 +101,16 @@ def detect_race_condition(mascm: MASCM) -> coroutine:
             s2_thread = s2[0][1].thread if isinstance(s2[0][1], Operation) else s2[0][0].thread
             if s1_thread == s2_thread:
                 continue
-            ignored_edges = []
+            # Subgraphs of threads without common resource cannot contain race condition
+            if not context.access_matrix.shares_resource(s1_thread.index, s2_thread.index):
+                continue
+            ignored_edges = frozenset()
             if s1_thread.depth < s2_thread.depth:
-                ignored_edges = prepare_ignored_edges(s1_thread.index, mascm.edges)
+                ignored_edges = context.ignored_edges(s1_thread.index)
             elif s1_thread.depth == s2_thread.depth:
                 logging.debug(f"Comparing threads t1({s1_thread}) and t2({s2_thread}) with equal depth!")
             else:
-                ignored_edges = prepare_ignored_edges(s2_thread.index, mascm.edges)
+                ignored_edges = context.ignored_edges(s2_thread.index)
 
             comparator = GraphComparator(s1, s2, ignored_edges)
             if not comparator.can_be_compared():
@@ -158,5 +118,5 @@ def detect_race_condition(mascm: MASCM) -> coroutine:
                 continue
             for op in comparator.locate_race_condition():
                 if op not in reported_op:
-                    reported_op.append(op)
+                    reported_op.add(op)
                     yield op
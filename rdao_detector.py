@@ -6,15 +6,27 @@ __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
 import argparse
-from helpers.common import functions_pair, resource_usage
+from helpers.common import functions_pair, positive_int, resource_usage
 import config as c
 from helpers import DeadlockType, lock_types_str, deadlock_causes_str
 from helpers.rdao_helper import get_operation_from_edge, get_operation_name_from_edge, get_resource_name_from_edge
 from itertools import chain
 import logging
-from mascm_generator import create_ast, create_mascm
+from mascm_generator import create_model
+from os import cpu_count
 from os.path import join, dirname
-from rdao import detect_atomicity_violation, detect_deadlock, detect_order_violation, detect_race_condition
+from rdao import AnalysisContext, detect_atomicity_violation, detect_deadlock, detect_deadlock_by_lock_order, \
+    detect_order_violation, detect_race_condition, detect_race_condition_by_locksets
+
+race_engines = {  # Implementations of race condition detection
+    "graph": detect_race_condition,
+    "lockset": detect_race_condition_by_locksets
+}
+
+deadlock_engines = {  # Implementations of deadlock detection
+    "pairs": detect_deadlock,
+    "lock-order": detect_deadlock_by_lock_order
+}
 
 
 parser = argparse.ArgumentParser(description='Detect RDAO Bugs')
@@ -35,6 +47,30 @@ parser.add_argument(
     nargs="+"
 )
 parser.add_argument('-r', '--resource-usage', action='store_true', help="Show resources usage")
+parser.add_argument(
+    '-j', '--jobs', type=positive_int, default=cpu_count() or 1,
+    help="Number of files preprocessed and parsed at the same time"
+)
+parser.add_argument('--cache-dir', type=str, default=c.cache_dir, help="Directory with cached artifacts of analysis")
+parser.add_argument('--no-cache', action='store_true', help="Do not use cached artifacts of analysis")
+parser.add_argument(
+    '--compile-commands', type=str, default=None,
+    help="Path to compile_commands.json file with compiler flags of every file, files outside of path are skipped"
+)
+parser.add_argument(
+    '--incremental', action='store_true', help="Reuse artifacts of translation units which did not change"
+)
+parser.add_argument('--keep-pure', action='store_true', help="Save purified code in pure files")
+parser.add_argument(
+    '--race-engine', type=str, choices=tuple(race_engines.keys()), default="graph",
+    help="Race condition detection method: comparison of thread graphs, or comparison of sets of locked mutexes "
+         "during accesses to resources"
+)
+parser.add_argument(
+    '--deadlock-engine', type=str, choices=tuple(deadlock_engines.keys()), default="pairs",
+    help="Mutually exclusive locks detection method: comparison of every pair of mutex collections, or search of "
+         "cycles in graph of order of locking mutexes"
+)
 parser.add_argument('--version', action='version', version=f"%(prog)s {__version__}")
 
 
@@ -45,11 +81,12 @@ def main(args):
     c.relations['backward'].extend(args.backward_rel_pairs)
     c.relations['symmetric'].extend(args.symmetric_rel_pairs)
     logging.basicConfig(filename=join(dirname(__file__), "rdao.log"), level=args.log_level)
-    mascm = create_mascm(create_ast(args.path, args.cflags))
+    mascm = create_model(args)
+    context = AnalysisContext(mascm)  # Shared by all detectors
 
     reported_errors = 0
     print("Race conditions:")
-    for edge in detect_race_condition(mascm):
+    for edge in race_engines[args.race_engine](mascm, context):
         print(f"\tRace condition detected in element: {edge}")
         print("\tError can be found in")
         print(f"\t\t{edge.first.node.coord}")
@@ -62,7 +99,7 @@ def main(args):
 
     reported_errors = 0
     print("Deadlocks:")
-    for cause, edges in detect_deadlock(mascm):
+    for cause, edges in deadlock_engines[args.deadlock_engine](mascm, context):
         if DeadlockType.incorrect_lock_type != cause:
             print(f"\tDeadlock detected involving a set of locks: {set((edge.first for edge in chain(*edges)))}")
         else:
@@ -87,7 +124,7 @@ def main(args):
 
     reported_errors = 0
     print("Atomicity violations:")
-    for collection in detect_atomicity_violation(mascm):
+    for collection in detect_atomicity_violation(mascm, context):
         for f_edge, s_edge, *rest in collection:
             f_name = get_operation_name_from_edge(f_edge)
             s_name = get_operation_name_from_edge(s_edge)
@@ -104,7 +141,7 @@ def main(args):
 
     reported_errors = 0
     print("Order violations:")
-    for op1, op2, resource in detect_order_violation(mascm):
+    for op1, op2, resource in detect_order_violation(mascm, context):
         print(f"\tOrder violation detected for pair: {op1.name}, {op2.name}")
         print(f"\t\t{op1.name} is located in {op1.node.coord}")
         print(f"\t\t{op2.name} is located in {op2.node.coord}")
@@ -0,0 +1,47 @@
+#include <stdio.h>
+#include <pthread.h>
+
+static volatile int r1 = 0;
+pthread_mutex_t m, n, o;
+
+void* deposit1(void *args) {
+    pthread_mutex_lock(&m);
+    pthread_mutex_lock(&n);
+    ++r1;
+    pthread_mutex_unlock(&n);
+    pthread_mutex_unlock(&m);
+    return NULL;
+}
+
+void* deposit2(void *args) {
+    pthread_mutex_lock(&n);
+    pthread_mutex_lock(&o);
+    ++r1;
+    pthread_mutex_unlock(&o);
+    pthread_mutex_unlock(&n);
+    return NULL;
+}
+
+void* deposit3(void *args) {
+    pthread_mutex_lock(&o);
+    pthread_mutex_lock(&m);
+    ++r1;
+    pthread_mutex_unlock(&m);
+    pthread_mutex_unlock(&o);
+    return NULL;
+}
+
+int main() {
+    pthread_t t1, t2, t3;
+    printf("App start work with r1 = %d\r\n", r1);
+
+    pthread_create(&t1, NULL, deposit1, NULL);
+    pthread_create(&t2, NULL, deposit2, NULL);
+    pthread_create(&t3, NULL, deposit3, NULL);
+
+    pthread_join(t1, NULL);
+    pthread_join(t2, NULL);
+    pthread_join(t3, NULL);
+    printf("App finish work with r1 = %d\r\n", r1);
+    return 0;
+}
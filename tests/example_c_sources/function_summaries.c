@@ -0,0 +1,51 @@
+#include <stdio.h>
+#include <stdlib.h>
+#include <pthread.h>
+
+static volatile int counter = 0;
+pthread_mutex_t m;
+
+int clamp(int value) {
+    int result = value;
+    if (result > 100) {
+        result = 100;
+    } else {
+        result = value;
+    }
+    return result;
+}
+
+void update(int step) {
+    pthread_mutex_lock(&m);
+    switch (step) {
+        case 1:
+            counter++;
+            break;
+        default:
+            counter--;
+            break;
+    }
+    pthread_mutex_unlock(&m);
+    clamp(step);
+}
+
+void* worker(void *args) {
+    for (int i = 0; i < 10; i++) {
+        update(1);
+        update(2);
+    }
+    update(1);
+    return NULL;
+}
+
+int main() {
+    pthread_t t1, t2;
+    pthread_create(&t1, NULL, worker, NULL);
+    pthread_create(&t2, NULL, worker, NULL);
+    update(1);
+    clamp(counter);
+    pthread_join(t1, NULL);
+    pthread_join(t2, NULL);
+    printf("%d\n", counter);
+    return 0;
+}
@@ -0,0 +1,71 @@
+#include <stdio.h>
+#include <pthread.h>
+
+static volatile int r1 = 0;
+pthread_mutex_t g, m, n, o;
+
+void* deposit1(void *args) {
+    pthread_mutex_lock(&g);
+    pthread_mutex_lock(&m);
+    pthread_mutex_lock(&n);
+    ++r1;
+    pthread_mutex_unlock(&n);
+    pthread_mutex_unlock(&m);
+    pthread_mutex_unlock(&g);
+    return NULL;
+}
+
+void* deposit2(void *args) {
+    pthread_mutex_lock(&g);
+    pthread_mutex_lock(&n);
+    pthread_mutex_lock(&o);
+    ++r1;
+    pthread_mutex_unlock(&o);
+    pthread_mutex_unlock(&n);
+    pthread_mutex_unlock(&g);
+    return NULL;
+}
+
+void* deposit3(void *args) {
+    pthread_mutex_lock(&g);
+    pthread_mutex_lock(&o);
+    pthread_mutex_lock(&m);
+    ++r1;
+    pthread_mutex_unlock(&m);
+    pthread_mutex_unlock(&o);
+    pthread_mutex_unlock(&g);
+    return NULL;
+}
+
+int main() {
+    pthread_t t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11, t12;
+    printf("App start work with r1 = %d\r\n", r1);
+
+    pthread_create(&t1, NULL, deposit1, NULL);
+    pthread_create(&t2, NULL, deposit1, NULL);
+    pthread_create(&t3, NULL, deposit1, NULL);
+    pthread_create(&t4, NULL, deposit1, NULL);
+    pthread_create(&t5, NULL, deposit2, NULL);
+    pthread_create(&t6, NULL, deposit2, NULL);
+    pthread_create(&t7, NULL, deposit2, NULL);
+    pthread_create(&t8, NULL, deposit2, NULL);
+    pthread_create(&t9, NULL, deposit3, NULL);
+    pthread_create(&t10, NULL, deposit3, NULL);
+    pthread_create(&t11, NULL, deposit3, NULL);
+    pthread_create(&t12, NULL, deposit3, NULL);
+
+    pthread_join(t1, NULL);
+    pthread_join(t2, NULL);
+    pthread_join(t3, NULL);
+    pthread_join(t4, NULL);
+    pthread_join(t5, NULL);
+    pthread_join(t6, NULL);
+    pthread_join(t7, NULL);
+    pthread_join(t8, NULL);
+    pthread_join(t9, NULL);
+    pthread_join(t10, NULL);
+    pthread_join(t11, NULL);
+    pthread_join(t12, NULL);
+    printf("App finish work with r1 = %d\r\n", r1);
+    return 0;
+}
@@ -0,0 +1,46 @@
+#include <stdio.h>
+#include <pthread.h>
+
+static long long r1;
+pthread_mutex_t m1;
+
+void* locked_deposit(void *args) {
+    pthread_mutex_lock(&m1);
+    ++r1;
+    pthread_mutex_unlock(&m1);
+    return NULL;
+}
+
+void* report(void *args) {
+    printf("Report: %lld\r\n", r1);
+    return NULL;
+}
+
+int main() {
+    pthread_t t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11;
+    pthread_mutex_init(&m1, NULL);
+    pthread_create(&t1, NULL, locked_deposit, NULL);
+    pthread_create(&t2, NULL, report, NULL);
+    pthread_create(&t3, NULL, report, NULL);
+    pthread_create(&t4, NULL, report, NULL);
+    pthread_create(&t5, NULL, report, NULL);
+    pthread_create(&t6, NULL, report, NULL);
+    pthread_create(&t7, NULL, report, NULL);
+    pthread_create(&t8, NULL, report, NULL);
+    pthread_create(&t9, NULL, report, NULL);
+    pthread_create(&t10, NULL, report, NULL);
+    pthread_create(&t11, NULL, report, NULL);
+    pthread_join(t1, NULL);
+    pthread_join(t2, NULL);
+    pthread_join(t3, NULL);
+    pthread_join(t4, NULL);
+    pthread_join(t5, NULL);
+    pthread_join(t6, NULL);
+    pthread_join(t7, NULL);
+    pthread_join(t8, NULL);
+    pthread_join(t9, NULL);
+    pthread_join(t10, NULL);
+    pthread_join(t11, NULL);
+    pthread_mutex_destroy(&m1);
+    return 0;
+}
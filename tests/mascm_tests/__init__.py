@@ -8,8 +8,10 @@ __version__ = "1.1"
 import unittest
 
 from tests.mascm_tests.create_mascm_test import CreateMamTest
+from tests.mascm_tests.edge_test import EdgeTest
 from tests.mascm_tests.helpers_test import HelpersTest
 from tests.mascm_tests.mascm_test import MultithreadedApplicationSourceCodeModelTest
+from tests.mascm_tests.symbol_table_test import SymbolTableTest
 
 if "__main__" == __name__:
     unittest.main()
@@ -6,6 +6,7 @@ __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import config as c
 from helpers.path import collect_c_project_files
 from helpers.purifier import purify, purify_files
@@ -13,8 +14,11 @@ from mascm import create_mascm
 from os import remove
 from os.path import join
 from pycparser import parse_file
+from rdao import detect_atomicity_violation, detect_deadlock, detect_race_condition
+import sys
 from tests.test_base import TestBase
 import unittest
+from unittest.mock import patch
 
 
 class CreateMamTest(unittest.TestCase, TestBase):
@@ -1052,6 +1056,86 @@ class CreateMamTest(unittest.TestCase, TestBase):
         self.__test_thread_nesting(result.threads)
         self.assertEqual(expected_mascm, str(result))
 
+    def test_create_mascm_concurrently(self):
+        files_to_parse = ("race_condition1.c", "deadlock_mix.c", "recursion1.c", "for_loop_with_break4.c",
+                          "atomicity_violation3.c", "order_violation2.c")
+        asts = list()
+        for file_to_parse in files_to_parse:
+            with purify(join(self.source_path_prefix, file_to_parse)) as pure_file_path:
+                asts.append(parse_file(pure_file_path))
+        expected_models = [str(create_mascm(deque([ast]))) for ast in asts]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda ast: create_mascm(deque([ast])), asts * 4))
+        self.assertEqual(expected_models * 4, [str(result) for result in results])
+        self.assertIsNot(results[0].local_resources, results[1].local_resources)
+        self.assertIsNot(results[0].struct_defs, results[1].struct_defs)
+        self.assertIsNot(results[0].context, results[1].context)
+
+    def test_function_summaries_give_the_same_model(self):
+        file_path = join(self.source_path_prefix, "function_summaries.c")
+        with purify(file_path) as pure_file_path:
+            ast = parse_file(pure_file_path)
+        result = create_mascm(deque([ast]))
+        self.assertTrue(result.context.function_summaries)
+
+        create_mascm_module = sys.modules["mascm.create_mascm"]
+        with patch.object(create_mascm_module, "walk_function_definition",
+                          create_mascm_module.parse_function_definition):
+            expected_result = create_mascm(deque([ast]))
+        self.assertEqual(str(expected_result), str(result))
+        for detector in (detect_race_condition, detect_deadlock, detect_atomicity_violation):
+            self.assertEqual(str(list(detector(expected_result))), str(list(detector(result))))
+
+    def test_structure_index_matches_scans_of_operations(self):
+        create_structure_index = sys.modules["mascm.create_mascm"].create_structure_index
+        for file_name in ("switch_case5.c", "while_loop_with_break4.c", "recursion2.c",
+                          "single_thread_global_variable_if_else_statement.c", "do_while_loop_with_break3.c"):
+            with purify(join(self.source_path_prefix, file_name)) as pure_file_path:
+                ast = parse_file(pure_file_path)
+            operations = create_mascm(deque([ast])).o
+            index = create_structure_index(operations)
+            positions = range(len(operations))
+            for i, o in enumerate(operations):
+                self.assertEqual(next((j for j in positions[i+1:] if operations[j].node is o.node), None),
+                                 index.next_same_node[i])
+                self.assertEqual(next(j for j in positions if operations[j].node is o.node), index.first_same_node[i])
+                self.assertEqual(next((j for j in positions[i:] if not operations[j].is_loop_body_operation), None),
+                                 index.outside_loop[i])
+                self.assertEqual(next((j for j in positions[i:] if not operations[j].is_switch_case_operation), None),
+                                 index.outside_switch[i])
+                self.assertEqual(next((j for j in positions[i+1:] if operations[j].function != o.function), None),
+                                 index.next_other_function[i])
+                self.assertEqual(next((j for j in positions[i+1:] if (operations[j].function != o.function) and
+                                       (operations[j].thread.index == o.thread.index)), None),
+                                 index.next_other_function_in_thread[i])
+
+    def test_time_units_contain_threads_of_model(self):
+        with purify(join(self.source_path_prefix, "race_condition10.c")) as pure_file_path:
+            ast = parse_file(pure_file_path)
+        result = create_mascm(deque([ast]))
+        self.assertTrue(result.time_units)
+        for unit in result.time_units:
+            for thread in unit:
+                self.assertTrue(any(thread is t for t in result.threads))
+
+    def test_relation_index_contains_builtin_names(self):
+        module = sys.modules["mascm.create_mascm"]
+        index = module.create_relation_index({"forward": {("malloc", "free")}, "symmetric": {("va_arg", "va_arg")}})
+        self.assertListEqual([module.RelationRole(("malloc", "free"), True, False)], index["forward"]["malloc"])
+        self.assertListEqual([module.RelationRole(("malloc", "free"), False, True)],
+                             index["forward"]["__builtin_free"])
+        self.assertListEqual([module.RelationRole(("va_arg", "va_arg"), True, True)],
+                             index["symmetric"]["__builtin_va_arg"])
+        self.assertNotIn("printf", index["forward"])
+
+    def test_first_opened_relation_is_found(self):
+        find_opened_relation = sys.modules["mascm.create_mascm"].find_opened_relation
+        handler = {"free": {"a": 3, "b": 4}, "__builtin_free": {"c": 2}, "realloc": {"d": 1}}
+        self.assertEqual(("__builtin_free", "c"), find_opened_relation(handler, ("free", "__builtin_free")))
+        self.assertEqual(("free", "a"), find_opened_relation(handler, ("free", "fclose")))
+        self.assertIsNone(find_opened_relation(handler, ("fclose", )))
+
 
 if "__main__" == __name__:
     unittest.main()
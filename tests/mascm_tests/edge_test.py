@@ -0,0 +1,93 @@
+#!/usr/bin/env python3.8
+
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from collections import deque
+from copy import deepcopy
+from helpers import EdgeType, get_edge_index, get_time_units_graphs
+from helpers.exceptions import MASCMException
+from helpers.purifier import purify
+from mascm import create_mascm, Edge, EdgeList, Lock, Operation, Resource
+from os.path import join
+import pickle
+from pycparser import parse_file
+from tests.test_base import TestBase
+import unittest
+
+
+class EdgeTest(unittest.TestCase, TestBase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        with purify(join(cls.source_path_prefix, "race_condition10.c")) as pure_file_path:
+            ast = parse_file(pure_file_path)
+        cls.mascm = create_mascm(deque([ast]))
+
+    def test_kind_is_determined_when_edge_is_created(self):
+        for edge in self.mascm.edges:
+            self.assertIsNotNone(edge.kind)
+            self.assertEqual(edge.kind, edge.edge_type)
+            if isinstance(edge.first, Lock):
+                self.assertEqual(EdgeType.locking, edge.kind)
+            elif isinstance(edge.second, Lock):
+                self.assertEqual(EdgeType.unlocking, edge.kind)
+            elif isinstance(edge.first, Resource):
+                self.assertEqual(EdgeType.dependency, edge.kind)
+            elif isinstance(edge.second, Resource):
+                self.assertEqual(EdgeType.usage, edge.kind)
+            else:
+                self.assertIsInstance(edge.second, Operation)
+                self.assertEqual(EdgeType.transition, edge.kind)
+
+    def test_kind_of_unknown_edge(self):
+        edge = Edge(self.mascm.operations[0], None)
+        self.assertIsNone(edge.kind)
+        with self.assertRaises(MASCMException):
+            _ = edge.edge_type
+
+    def test_copied_edge_keeps_kind(self):
+        edge = self.mascm.edges[0]
+        self.assertEqual(edge.kind, pickle.loads(pickle.dumps(edge)).kind)
+        self.assertEqual(edge.kind, deepcopy(edge).kind)
+
+    def test_edge_list_keeps_edges_of_kinds(self):
+        edges = EdgeList(self.mascm.edges)
+        for kind in EdgeType:
+            self.assertListEqual([edge for edge in self.mascm.edges if edge.kind == kind], edges.of_kind(kind))
+        last = edges.pop()
+        self.assertEqual(len([edge for edge in edges if edge.kind == last.kind]), len(edges.of_kind(last.kind)))
+        edges.append(last)
+        edges.insert(0, last)
+        for kind in EdgeType:
+            self.assertListEqual([edge for edge in edges if edge.kind == kind], edges.of_kind(kind))
+
+    def test_edge_index_is_built_again_after_modification_of_edges(self):
+        index = get_edge_index(self.mascm)
+        self.assertIs(index, get_edge_index(self.mascm))
+        self.assertEqual(get_time_units_graphs(self.mascm.time_units, list(self.mascm.edges)),
+                         index.time_units_graphs(self.mascm.time_units))
+        self.mascm.edges.append(self.mascm.edges.pop())
+        self.assertIsNot(index, get_edge_index(self.mascm))
+
+    def test_edges_of_thread(self):
+        index = get_edge_index(self.mascm)
+        for thread in self.mascm.threads:
+            edges = index.thread_edges(thread)
+            self.assertListEqual([edge for edge in self.mascm.edges if index.is_edge_of_thread(edge, thread)], edges)
+
+    def test_model_elements_are_hashable(self):
+        elements = list(self.mascm.threads) + list(self.mascm.operations) + list(self.mascm.resources) + \
+            list(self.mascm.mutexes) + list(self.mascm.edges)
+        for element in elements:
+            copied_element = pickle.loads(pickle.dumps(element))
+            self.assertEqual(element, copied_element)
+            self.assertEqual(hash(element), hash(copied_element))
+        self.assertEqual(len(set(self.mascm.operations)), len(self.mascm.operations))
+        self.assertEqual(len(set(self.mascm.resources)), len(self.mascm.resources))
+        self.assertIn(self.mascm.edges[-1], set(self.mascm.edges))
+
+
+if "__main__" == __name__:
+    unittest.main()
@@ -6,11 +6,22 @@ __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
 import config as c
+from helpers.cache import Cache, cache_statistics
+from helpers.compilation_database import load_compile_commands
+import helpers.parser
+from helpers.parser import get_parser, parse_pure_file, parse_texts
 from helpers.path import collect_c_project_files, get_project_path
-from helpers.purifier import purify, purify_file
-from os.path import getsize, join
-from os import remove
+from helpers.purifier import preprocess_file, preprocess_files, purify, purify_file, purify_files
+from mascm import create_mascm
+from mascm_generator import create_ast, create_model, create_translation_units, parser as arguments_parser, \
+    purify_sources
+from os.path import exists, getmtime, getsize, join
+from os import listdir, remove
+from tempfile import TemporaryDirectory
+import json
+import sys
 import unittest
+from unittest.mock import patch
 
 
 class HelpersTest(unittest.TestCase):
@@ -49,6 +60,222 @@ class HelpersTest(unittest.TestCase):
         with self.assertRaises(FileNotFoundError):
             purify_file(file_path)
 
+    def test_purify_files_keeps_order_of_files(self):
+        dir_path = join(self.multiple_files_app_path_prefix, "2")
+        paths = list(collect_c_project_files(dir_path))
+        sources = [path for path in paths if path.endswith(".c")]
+        pure_files = purify_files(paths, jobs=4)
+        try:
+            self.assertListEqual([f"{path}.pure" for path in sources], list(pure_files))
+        finally:
+            for pure_file in pure_files:
+                remove(pure_file)
+
+    def test_purify_files_reports_all_failures(self):
+        with TemporaryDirectory() as dir_path:
+            paths = list()
+            for name in ("first.c", "second.c"):
+                paths.append(join(dir_path, name))
+                with open(paths[-1], "w") as f:
+                    f.write('#include "missing_header.h"\n')
+            with patch("helpers.purifier.logging") as logging_mock, self.assertRaises(SystemExit):
+                purify_files(paths, jobs=2)
+        messages = [str(call.args[0]) for call in logging_mock.critical.call_args_list]
+        for path in paths:
+            self.assertIn(f"Critical error during purifizing file: {path}", messages)
+
+    def test_purify_file_uses_cache(self):
+        with TemporaryDirectory() as dir_path:
+            source_path = join(dir_path, "main.c")
+            header_path = join(dir_path, "shared.h")
+            with open(source_path, "w") as f:
+                f.write('#include "shared.h"\nint main() { return VALUE; }\n')
+            with open(header_path, "w") as f:
+                f.write("#define VALUE 1\n")
+            cache = Cache(join(dir_path, "cache"), "purified")
+
+            with open(purify_file(source_path, cache=cache)) as f:
+                first_content = f.read()
+            with patch("helpers.purifier.Popen") as popen_mock:
+                with open(purify_file(source_path, cache=cache)) as f:
+                    self.assertEqual(first_content, f.read())
+                popen_mock.assert_not_called()
+
+            with open(header_path, "w") as f:
+                f.write("#define VALUE 2\n")
+            with open(purify_file(source_path, cache=cache)) as f:
+                self.assertIn("return 2;", f.read())
+
+    def test_cache_evicts_least_recently_used_entries(self):
+        with TemporaryDirectory() as dir_path:
+            cache = Cache(dir_path, "test", max_size=2500)
+            cache.put("first", b"1" * 1000)
+            cache.put("second", b"2" * 1000)
+            self.assertIsNotNone(cache.get("first"))
+            cache.put("third", b"3" * 1000)
+            self.assertEqual(2, len(listdir(cache.directory)))
+            self.assertIsNone(cache.get("second"))
+            self.assertEqual(b"1" * 1000, cache.get("first"))
+            self.assertEqual(b"3" * 1000, cache.get("third"))
+
+    def test_cache_counts_overwritten_entries_once(self):
+        with TemporaryDirectory() as dir_path:
+            cache = Cache(dir_path, "test", max_size=2500)
+            cache.put("first", b"1" * 1000)
+            with patch.object(Cache, "_Cache__evict") as evict_mock:
+                for _ in range(3):
+                    cache.put("second", b"2" * 1000)
+                evict_mock.assert_not_called()
+            self.assertEqual(b"1" * 1000, cache.get("first"))
+            self.assertEqual(b"2" * 1000, cache.get("second"))
+
+    def test_parse_pure_file_uses_cache(self):
+        file_path: str = join(self.source_path_prefix, "single_thread_for_loop.c")
+        with TemporaryDirectory() as dir_path, purify(file_path) as pure_file_path:
+            cache = Cache(dir_path, "ast")
+            hits = cache_statistics["ast"]["hits"]
+            ast = parse_pure_file(pure_file_path, cache)
+            with patch("helpers.parser.get_parser") as parser_mock:
+                cached_ast = parse_pure_file(pure_file_path, cache)
+                parser_mock.assert_not_called()
+        self.assertEqual(hits + 1, cache_statistics["ast"]["hits"])
+        self.assertEqual(len(ast.ext), len(cached_ast.ext))
+        self.assertEqual(str(ast.ext[-1].coord), str(cached_ast.ext[-1].coord))
+
+    def test_preprocess_file_does_not_create_pure_file(self):
+        file_path: str = join(self.source_path_prefix, "single_thread_for_loop.c")
+        text = preprocess_file(file_path)
+        self.assertFalse(exists(f"{file_path}.pure"))
+        with purify(file_path) as pure_file_path, open(pure_file_path) as f:
+            self.assertEqual(f.read(), text)
+
+    def test_create_ast_keeps_pure_files_only_on_request(self):
+        dir_path = join(self.multiple_files_app_path_prefix, "1")
+        sources = [file for file in collect_c_project_files(dir_path) if file.endswith(".c")]
+        ast = create_ast(dir_path)
+        self.assertFalse(any(exists(f"{file}.pure") for file in sources))
+        kept_ast = create_ast(dir_path, keep_pure=True)
+        try:
+            self.assertTrue(all(exists(f"{file}.pure") for file in sources))
+        finally:
+            for file in sources:
+                remove(f"{file}.pure")
+        self.assertEqual([len(tree.ext) for tree in ast], [len(tree.ext) for tree in kept_ast])
+
+    def test_parse_texts_keeps_order_of_files(self):
+        dir_path = join(self.multiple_files_app_path_prefix, "2")
+        sources = preprocess_files(collect_c_project_files(dir_path))
+        serial_ast = parse_texts(sources)
+        parallel_ast = parse_texts(sources, jobs=4)
+        self.assertEqual(len(sources), len(parallel_ast))
+        for serial_tree, parallel_tree in zip(serial_ast, parallel_ast):
+            self.assertEqual(str(serial_tree.ext[-1].coord), str(parallel_tree.ext[-1].coord))
+            self.assertEqual(len(serial_tree.ext), len(parallel_tree.ext))
+
+    def test_parse_texts_with_deep_ast(self):
+        arms = "".join(f" else if (x == {i}) {{ y = {i}; }}" for i in range(1, 1500))
+        sources = [("deep.c", f"int f(int x) {{ int y = 0; if (x == 0) {{ y = 0; }}{arms} return y; }}"),
+                   ("main.c", "int main(void) { return 0; }")]
+        ast = parse_texts(sources, jobs=2)
+        self.assertEqual(2, len(ast))
+        self.assertEqual("f", ast[0].ext[0].decl.name)
+        self.assertEqual("main", ast[1].ext[0].decl.name)
+
+    def test_get_parser_stores_generated_tables(self):
+        parser = getattr(helpers.parser, "__parser")
+        try:
+            with TemporaryDirectory() as dir_path, \
+                    patch("helpers.parser._package_tables_available", return_value=False):
+                setattr(helpers.parser, "__parser", None)
+                get_parser(dir_path)
+                tables = sorted(listdir(dir_path))
+                self.assertEqual(["pycparser_lextab.py", "pycparser_yacctab.py"], tables)
+                modification_times = [getmtime(join(dir_path, table)) for table in tables]
+
+                setattr(helpers.parser, "__parser", None)
+                self.assertIs(get_parser(dir_path), get_parser())
+                self.assertEqual(modification_times, [getmtime(join(dir_path, table)) for table in tables])
+                ast = get_parser().parse("int main(void) { return 0; }", "main.c")
+                self.assertEqual("main", ast.ext[0].decl.name)
+                sys.path.remove(dir_path)
+        finally:
+            setattr(helpers.parser, "__parser", parser)
+
+    def test_create_model_without_cache_does_not_store_parser_tables(self):
+        parser = getattr(helpers.parser, "__parser")
+        try:
+            with TemporaryDirectory() as dir_path, \
+                    patch("helpers.parser._package_tables_available", return_value=False):
+                setattr(helpers.parser, "__parser", None)
+                file_path = join(self.source_path_prefix, "deadlock1.c")
+                args = arguments_parser.parse_args([file_path, "--no-cache", "--cache-dir", dir_path, "-j", "1"])
+                self.assertEqual(3, len(create_model(args).threads))
+                self.assertListEqual([], listdir(dir_path))
+                self.assertNotIn(join(dir_path, "parser_tables"), sys.path)
+        finally:
+            setattr(helpers.parser, "__parser", parser)
+
+    def test_load_compile_commands(self):
+        dir_path = join(self.multiple_files_app_path_prefix, "2")
+        entries = [
+            {"directory": dir_path, "file": "sources/main.c",
+             "command": "gcc -c -Wall -I./headers -DDEBUG=1 -std=c99 -o main.o sources/main.c"},
+            {"directory": dir_path, "file": "sources/main.c", "command": "gcc -c sources/main.c"},
+            {"directory": dir_path, "file": join(dir_path, "headers/main.h"), "command": "gcc -c headers/main.h"},
+            {"directory": join(dir_path, "sources"), "file": "threads.c",
+             "arguments": ["gcc", "-c", "-I", "../headers", "threads.c"]},
+        ]
+        with TemporaryDirectory() as tmp_dir:
+            database_path = join(tmp_dir, "compile_commands.json")
+            with open(database_path, "w") as f:
+                json.dump(entries, f)
+            commands = load_compile_commands(database_path)
+            filtered_commands = load_compile_commands(database_path, join(dir_path, "sources", "threads.c"))
+
+        headers_dir = join(dir_path, "headers")
+        self.assertEqual(2, len(commands))
+        self.assertEqual(join(dir_path, "sources", "main.c"), commands[0].file)
+        self.assertEqual([f"-I{headers_dir}", "-DDEBUG=1", "-std=c99"], commands[0].flags)
+        self.assertEqual(join(dir_path, "sources", "threads.c"), commands[1].file)
+        self.assertEqual(["-I", headers_dir], commands[1].flags)
+        self.assertEqual(commands[1:], filtered_commands)
+
+    def test_create_ast_with_compile_commands(self):
+        dir_path = join(self.multiple_files_app_path_prefix, "3")
+        entries = [
+            {"directory": dir_path, "file": file, "command": f"gcc -c -Wall -I./src/inc {file}"}
+            for file in ("main.c", "src/threads.c", "src/shared.c")
+        ]
+        with TemporaryDirectory() as tmp_dir:
+            database_path = join(tmp_dir, "compile_commands.json")
+            with open(database_path, "w") as f:
+                json.dump(entries, f)
+            with patch("mascm_generator.preprocess_files") as preprocess_files_mock:
+                ast = create_ast(dir_path, compile_commands=database_path)
+                preprocess_files_mock.assert_not_called()
+        expected_ast = create_ast(dir_path)
+        self.assertEqual(
+            sorted((tree.ext[-1].coord.file, len(tree.ext)) for tree in expected_ast),
+            sorted((tree.ext[-1].coord.file, len(tree.ext)) for tree in ast)
+        )
+
+    def test_create_translation_units_reuses_unchanged_units(self):
+        dir_path = join(self.multiple_files_app_path_prefix, "4")
+        expected_mascm = str(create_mascm(create_ast(dir_path)))
+        sources = purify_sources(dir_path)
+        with TemporaryDirectory() as tmp_dir:
+            cache = Cache(tmp_dir, "units")
+            _, _, reused = create_translation_units(sources, cache=cache)
+            self.assertEqual(0, reused)
+            changed_file, changed_text = sources[0]
+            sources[0] = (changed_file, changed_text + "\nint unused_counter;\n")
+            _, _, reused = create_translation_units(sources, cache=cache)
+            self.assertEqual(len(sources) - 1, reused)
+            sources[0] = (changed_file, changed_text)
+            asts, declarations, reused = create_translation_units(sources, cache=cache)
+            self.assertEqual(len(sources), reused)
+        self.assertEqual(expected_mascm, str(create_mascm(asts, declarations)))
+
     def test_collect_c_files_from_dir(self):
         dir_path = join(self.multiple_files_app_path_prefix, "1")
         self.assertEqual(3, len(list(collect_c_project_files(dir_path))))
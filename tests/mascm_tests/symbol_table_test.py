@@ -0,0 +1,69 @@
+#!/usr/bin/env python3.8
+
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from mascm.lock import Lock
+from mascm.resource import Resource
+from mascm.symbol_table import SymbolTable, resource_symbol
+from pycparser.c_parser import CParser
+import unittest
+
+
+class SymbolTableTest(unittest.TestCase):
+    def setUp(self) -> None:
+        code = "typedef int pthread_mutex_t; int a; int b; int a; pthread_mutex_t m;"
+        self.decls = CParser().parse(code, "test.c").ext[1:]
+        self.table = SymbolTable(Resource.symbols)
+
+    def test_first_and_last_follow_order_of_adding(self):
+        first, second, third = (Resource(decl) for decl in self.decls[:3])
+        for resource in (first, second, third):
+            self.table.add(resource)
+        self.assertIs(first, self.table.first("a"))
+        self.assertIs(third, self.table.last("a"))
+        self.assertIs(second, self.table.first("b"))
+        self.assertIsNone(self.table.first("c"))
+        self.assertIsNone(self.table.last(None))
+        self.assertEqual(3, len(self.table))
+
+    def test_alias_and_field_are_indexed(self):
+        first, second = Resource(self.decls[0]), Resource(self.decls[1])
+        self.table.add(first)
+        self.table.add(second)
+        generation = self.table.generation
+        second.add_name("a")
+        self.assertIs(first, self.table.first("a"))
+        self.assertIs(second, self.table.last("a"))
+        self.assertLess(generation, self.table.generation)
+
+        generation = self.table.generation
+        second.add_name("b")
+        self.assertEqual(generation, self.table.generation)
+
+        second.add_field("x")
+        self.assertIs(second, self.table.first(resource_symbol("b.x")))
+        self.assertIn("a.x", self.table)
+        self.assertNotIn(resource_symbol("b.x.y"), self.table)
+
+    def test_removed_element_is_not_found(self):
+        resource = Resource(self.decls[0])
+        self.table.add(resource)
+        self.table.remove(resource)
+        self.assertNotIn("a", self.table)
+        resource.add_name("c")
+        self.assertNotIn("c", self.table)
+        self.assertEqual(0, len(self.table))
+
+    def test_mutexes_are_indexed_by_name(self):
+        table = SymbolTable(Lock.symbols)
+        lock = Lock(self.decls[3], 1)
+        table.add(lock)
+        self.assertIs(lock, table.first("m"))
+        self.assertIn("m", table)
+
+
+if "__main__" == __name__:
+    unittest.main()
@@ -5,8 +5,11 @@ __email__ = "damian.giebas@gmail.com"
 __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
+from tests.rdao_tests.analysis_context_test import AnalysisContextTest
 from tests.rdao_tests.atomicity_violation_test import DetectAtomicityViolationTest
 from tests.rdao_tests.deadlock_test import DetectDeadlockTest
+from tests.rdao_tests.lock_order_deadlock_test import DetectDeadlockByLockOrderTest
+from tests.rdao_tests.lockset_race_condition_test import DetectRaceConditionByLocksetsTest
 from tests.rdao_tests.order_violation_test import DetectOrderViolationTest
 from tests.rdao_tests.race_condition_test import DetectRaceConditionTest
 import unittest
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3.8
+
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+import config as c
+from helpers import EdgeType
+from itertools import chain
+from rdao import AnalysisContext, detect_atomicity_violation, detect_deadlock, detect_order_violation, \
+    detect_race_condition
+from rdao.analysis_context import CriticalSectionIndex, lock_bit, prepare_ignored_edges
+from tests.test_base import TestBase
+import unittest
+
+
+class AnalysisContextTest(unittest.TestCase, TestBase):
+    def tearDown(self) -> None:
+        c.relations["forward"] = []
+
+    def test_detectors_give_the_same_results_with_shared_context(self):
+        c.relations["forward"].append(("malloc", "free"))
+        detectors = (detect_race_condition, detect_deadlock, detect_atomicity_violation, detect_order_violation)
+        for file_to_parse in ("race_condition3.c", "deadlock_mix.c", "atomicity_violation2.c", "order_violation1.c"):
+            mascm = self.create_mascm(file_to_parse)
+            context = AnalysisContext(mascm)
+            for detector in detectors:
+                self.assertEqual(str(list(detector(mascm))), str(list(detector(mascm, context))), file_to_parse)
+
+    def test_views_are_computed_once(self):
+        context = AnalysisContext(self.create_mascm("deadlock_mix.c"))
+        self.assertIs(context.mutex_collections, context.mutex_collections)
+        self.assertIs(context.race_condition_subgraphs, context.race_condition_subgraphs)
+        for subgraph in context.atomicity_violation_subgraphs:
+            self.assertIs(context.critical_sections(subgraph), context.critical_sections(subgraph))
+
+    def test_held_locks_of_operations(self):
+        mascm = self.create_mascm("race_condition12.c")
+        context = AnalysisContext(mascm)
+        mutex_bit = lock_bit(mascm.mutexes[0])
+        for access in context.resource_accesses[mascm.resources[0]]:
+            operation = access.edge.first if access.is_write else access.edge.second
+            self.assertEqual(context.held_locks[operation], access.locks)
+            self.assertEqual(mutex_bit if access.thread.index == 1 else 0, access.locks)
+        lock_operation, *_, unlock_operation = mascm.threads[1].operations[:3]
+        self.assertEqual(mutex_bit, context.held_locks[lock_operation])
+        self.assertEqual(mutex_bit, context.held_locks[unlock_operation])
+
+    def test_held_locks_of_nested_critical_sections(self):
+        mascm = self.create_mascm("deadlock_mix.c")
+        context = AnalysisContext(mascm)
+        all_mutexes = sum(lock_bit(mutex) for mutex in mascm.mutexes)
+        for access in context.resource_accesses[mascm.resources[0]]:
+            if access.thread.index in (1, 2):
+                self.assertEqual(all_mutexes, access.locks)
+
+    def test_critical_sections_use_held_locks(self):
+        mascm = self.create_mascm("deadlock_mix.c")
+        context = AnalysisContext(mascm)
+        for graph in context.atomicity_violation_subgraphs:
+            sections = context.critical_sections(graph)
+            self.assertEqual(str(CriticalSectionIndex(graph).sections), str(sections))
+            for operation, _, held_mask, _ in chain(*sections.values()):
+                self.assertNotEqual(0, held_mask)
+                self.assertEqual(context.held_locks[operation], held_mask)
+
+    def test_ignored_edges_are_computed_once_per_thread(self):
+        mascm = self.create_mascm("race_condition12.c")
+        context = AnalysisContext(mascm)
+        for thread in mascm.threads:
+            ignored_edges = context.ignored_edges(thread.index)
+            self.assertSetEqual(set(prepare_ignored_edges(thread.index, mascm.edges)), ignored_edges)
+            self.assertIs(ignored_edges, context.ignored_edges(thread.index))
+
+    def test_access_matrix(self):
+        mascm = self.create_mascm("race_condition12.c")
+        matrix = AnalysisContext(mascm).access_matrix
+        self.assertEqual(1, matrix.writes(1))
+        self.assertEqual(0, matrix.writes(2))
+        self.assertEqual(1, matrix.reads(2))
+        self.assertTrue(matrix.shares_written_resource(1, 2))
+        self.assertTrue(matrix.shares_written_resource(3, 1))
+        self.assertFalse(matrix.shares_written_resource(2, 3))
+        self.assertTrue(matrix.shares_resource(2, 3))
+        self.assertFalse(matrix.shares_resource(2, len(mascm.threads)))
+
+    def test_resource_edges_of_operations(self):
+        mascm = self.create_mascm("race_condition10.c")
+        operation_resource_edges = AnalysisContext(mascm).operation_resource_edges
+        for operation in mascm.operations:
+            expected = [(edge.second, edge) if edge.first is operation else (edge.first, edge) for edge in mascm.edges
+                        if (edge.kind in (EdgeType.usage, EdgeType.dependency)) and
+                        ((edge.first is operation) or (edge.second is operation))]
+            self.assertListEqual(expected, operation_resource_edges.get(operation, []))
+
+
+if "__main__" == __name__:
+    unittest.main()
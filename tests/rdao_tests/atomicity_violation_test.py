@@ -7,11 +7,12 @@ __version__ = "1.1"
 
 import config as c
 from collections import deque
+from helpers import EdgeType
 from helpers.purifier import purify
 from mascm import create_mascm
 from os.path import join
 from pycparser import parse_file
-from rdao import detect_atomicity_violation
+from rdao import AnalysisContext, detect_atomicity_violation
 from tests.test_base import TestBase
 import unittest
 
@@ -146,6 +147,28 @@ class DetectAtomicityViolationTest(unittest.TestCase, TestBase):
         self.assertEqual(0, len(result))
         self.assertListEqual([], result)
 
+    def test_critical_section_index(self):
+        file_path = join(self.source_path_prefix, "atomicity_violation1.c")
+        c.relations["symmetric"].append(('++', 'printf'))
+        with purify(file_path) as pure_file_path:
+            ast = parse_file(pure_file_path)
+            mascm = create_mascm(deque([ast]))
+        context = AnalysisContext(mascm)
+        self.assertTrue(mascm.relations.symmetric)
+        for graph in context.atomicity_violation_subgraphs:
+            index = context.critical_section_index(graph)
+            self.assertIs(index, context.critical_section_index(graph))
+            section_ops = [section_op for section in index.sections.values() for section_op in section]
+            for f_op, s_op in mascm.relations.symmetric:
+                self.assertListEqual([section_op for section_op in section_ops if (section_op[0] == f_op) != (
+                    section_op[0] == s_op)], index.split_sections(f_op, s_op))
+                self.assertListEqual([], index.split_sections(f_op, f_op))
+            for resource in mascm.resources:
+                accesses = [edge for edge in graph if
+                            ((edge.kind == EdgeType.usage) and (edge.second == resource) and edge.first.name) or
+                            ((edge.kind == EdgeType.dependency) and (edge.first == resource) and edge.second.name)]
+                self.assertListEqual(accesses, index.accesses(resource))
+
 
 if "__main__" == __name__:
     unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3.8
+
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from mascm import Lock
+from rdao import AnalysisContext, detect_deadlock, detect_deadlock_by_lock_order
+from rdao.deadlock import DeadlockType
+from rdao.analysis_context import lock_bit
+from rdao.lock_order_deadlock import LockOrder, LockOrderGraph, select_orders
+from tests.test_base import TestBase
+import unittest
+
+
+class DetectDeadlockByLockOrderTest(unittest.TestCase, TestBase):
+    def test_deadlock1(self):
+        mascm = self.create_mascm("deadlock1.c")
+        expected = [(cause, list(edges)) for cause, edges in detect_deadlock(mascm)]
+        self.assertListEqual(expected, list(detect_deadlock_by_lock_order(mascm)))
+
+    def test_deadlock2(self):
+        mascm = self.create_mascm("deadlock2.c")
+        result = list(detect_deadlock_by_lock_order(mascm))
+        self.assertEqual(2, len(result), "Unexpected number of results.")
+        self.assertEqual((DeadlockType.exclusion_lock, [[mascm.edges[10], mascm.edges[12]],
+                                                        [mascm.edges[32], mascm.edges[34]]]), result[0])
+        self.assertEqual((DeadlockType.exclusion_lock, [[mascm.edges[12], mascm.edges[14]],
+                                                        [mascm.edges[30], mascm.edges[32]]]), result[1])
+
+    def test_deadlock5(self):
+        mascm = self.create_mascm("deadlock5.c")
+        self.assertListEqual([], list(detect_deadlock(mascm)))
+        result = list(detect_deadlock_by_lock_order(mascm))
+        self.assertEqual(1, len(result), "Unexpected number of results.")
+        cause, edges = result[0]
+        self.assertEqual(DeadlockType.exclusion_lock, cause, "Incorrect deadlock type")
+        self.assertListEqual([[mascm.edges[13], mascm.edges[15]], [mascm.edges[23], mascm.edges[25]],
+                              [mascm.edges[33], mascm.edges[35]]], edges)
+        self.assertListEqual([1, 2, 3], [pair[0].second.thread.index for pair in edges])
+
+    def test_deadlock6(self):
+        mascm = self.create_mascm("deadlock6.c")
+        self.assertEqual(13, len(mascm.threads), "Unexpected number of threads.")
+        self.assertListEqual([], list(detect_deadlock(mascm)))
+        result = list(detect_deadlock_by_lock_order(mascm))
+        self.assertEqual(1, len(result), "Unexpected number of results.")
+        cause, edges = result[0]
+        self.assertEqual(DeadlockType.exclusion_lock, cause, "Incorrect deadlock type")
+        self.assertListEqual([[mascm.edges[40], mascm.edges[42]], [mascm.edges[80], mascm.edges[82]],
+                              [mascm.edges[120], mascm.edges[122]]], edges)
+        self.assertListEqual([1, 5, 9], [pair[0].second.thread.index for pair in edges])
+
+    def test_deadlock_mix(self):
+        mascm = self.create_mascm("deadlock_mix.c")
+        result = list(detect_deadlock_by_lock_order(mascm))
+        self.assertEqual(2, len(result), "Unexpected number of results.")
+        self.assertEqual((DeadlockType.exclusion_lock, [[mascm.edges[10], mascm.edges[12]],
+                                                        [mascm.edges[28], mascm.edges[30]]]), result[0])
+        self.assertEqual(DeadlockType.missing_unlock, result[1][0], "Incorrect deadlock type")
+
+    def test_no_deadlock(self):
+        for file_to_parse in ("no_deadlock1.c", "no_deadlock2.c", "no_deadlock3.c", "no_deadlock4.c",
+                              "no_deadlock5.c", "race_condition1.c"):
+            mascm = self.create_mascm(file_to_parse)
+            self.assertListEqual([], list(detect_deadlock_by_lock_order(mascm)), file_to_parse)
+
+    def test_lock_order_graph_components(self):
+        mascm = self.create_mascm("deadlock5.c")
+        lock_edges = {edge.first.name: edge for edge in mascm.edges if isinstance(edge.first, Lock)}
+        graph = LockOrderGraph()
+        for first, second in (("m", "n"), ("n", "o"), ("o", "m"), ("n", "m")):
+            graph.add_order(LockOrder(mascm.threads[1], lock_edges[first], lock_edges[second], 0))
+        graph.add_mutex(lock_edges["m"].first)
+        self.assertEqual(1, len(graph.strongly_connected_components()))
+        self.assertSetEqual({"m", "n", "o"}, {mutex.name for mutex in graph.strongly_connected_components()[0]})
+        self.assertSetEqual({frozenset(("m", "n", "o")), frozenset(("m", "n"))},
+                            {frozenset(mutex.name for mutex in cycle) for cycle in graph.cycles()})
+
+
+    def test_select_orders_of_many_threads(self):
+        mascm = self.create_mascm("deadlock6.c")
+        context = AnalysisContext(mascm)
+        lock_edges = {edge.first.name: edge for edge in mascm.edges if isinstance(edge.first, Lock)}
+        cycle = [lock_edges[name].first for name in ("m", "n", "o")]
+        guard = lock_bit(cycle[0]) << len(cycle)
+        graph = LockOrderGraph()
+        for first, second in (("m", "n"), ("n", "o"), ("o", "m")):
+            for thread in mascm.threads[1:]:
+                for _ in range(3):
+                    graph.add_order(LockOrder(thread, lock_edges[first], lock_edges[second], guard))
+        # Every thread holds the same guard mutex, so none of lockings can be selected with another one
+        self.assertIsNone(select_orders(graph, cycle, context.concurrent_threads))
+        for first, second in (("m", "n"), ("n", "o"), ("o", "m")):
+            for thread in mascm.threads[1:]:
+                graph.add_order(LockOrder(thread, lock_edges[first], lock_edges[second], 0))
+        orders = select_orders(graph, cycle, context.concurrent_threads)
+        self.assertListEqual([1, 2, 3], [order.thread.index for order in orders])
+        self.assertListEqual([guard, 0, 0], [order.held for order in orders])
+
+
+if "__main__" == __name__:
+    unittest.main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3.8
+
+__author__ = "Damian Giebas"
+__email__ = "damian.giebas@gmail.com"
+__license__ = "GNU/GPLv3"
+__version__ = "1.1"
+
+from rdao import AnalysisContext, detect_race_condition, detect_race_condition_by_locksets
+from tests.test_base import TestBase
+import unittest
+
+
+class DetectRaceConditionByLocksetsTest(unittest.TestCase, TestBase):
+    def test_race_condition1(self):
+        mascm = self.create_mascm("race_condition1.c")
+        result = list(detect_race_condition_by_locksets(mascm))
+        self.assertListEqual(list(detect_race_condition(mascm)), result)
+        self.assertListEqual([mascm.edges[14], mascm.edges[22]], result)
+
+    def test_race_condition12(self):
+        mascm = self.create_mascm("race_condition12.c")
+        result = list(detect_race_condition_by_locksets(mascm, AnalysisContext(mascm)))
+        self.assertEqual(11, len(result), "Unexpected edges in the result.")
+        # Write made under mutex is still in race with reads made without mutex
+        self.assertEqual(mascm.edges[36], result[0])
+        self.assertEqual(1, result[0].first.thread.index)
+        self.assertListEqual(list(range(2, 12)), [edge.second.thread.index for edge in result[1:]])
+
+    def test_no_race_condition(self):
+        for file_to_parse in ("no_race_condition1.c", "no_race_condition2.c", "no_race_condition3.c",
+                              "no_race_condition4.c", "no_race_condition5.c", "no_race_condition6.c", "deadlock1.c"):
+            mascm = self.create_mascm(file_to_parse)
+            self.assertListEqual([], list(detect_race_condition_by_locksets(mascm)), file_to_parse)
+
+
+if "__main__" == __name__:
+    unittest.main()
@@ -145,6 +145,17 @@ class DetectRaceConditionTest(unittest.TestCase, TestBase):
         self.assertEqual(mascm.edges[31], result[3])
         self.assertEqual(mascm.edges[39], result[4])
 
+    def test_race_condition12(self):
+        file_to_parse = "race_condition12.c"
+        file_path = join(self.source_path_prefix, file_to_parse)
+        with purify(file_path) as pure_file_path:
+            ast = parse_file(pure_file_path)
+            mascm = create_mascm(deque([ast]))
+        result = list(detect_race_condition(mascm))
+        self.assertEqual(10, len(result), "Unexpected edges in the result.")
+        # Edges of threads with index starting with 1 cannot be taken as edges of thread t1
+        self.assertListEqual(list(range(2, 12)), [edge.second.thread.index for edge in result])
+
     def test_no_race_condition1(self):
         file_to_parse = "no_race_condition1.c"
         file_path = join(self.source_path_prefix, file_to_parse)
@@ -5,9 +5,13 @@ __email__ = "damian.giebas@gmail.com"
 __license__ = "GNU/GPLv3"
 __version__ = "1.1"
 
+from collections import deque
 from helpers.path import get_project_path
+from helpers.purifier import purify
 import logging
+from mascm import create_mascm
 from os.path import join
+from pycparser import parse_file
 
 logging.disable()
 # logging.basicConfig(level=logging.CRITICAL)
@@ -18,3 +22,13 @@ class TestBase:
     project_dir = get_project_path()
     source_path_prefix = join(project_dir, "tests/example_c_sources")
     multiple_files_app_path_prefix = join(source_path_prefix, "multiple_files_apps")
+
+    def create_mascm(self, file_to_parse: str):
+        """ Method create MASCM of example C source
+        :param file_to_parse: Name of file placed in example sources directory
+        :return: MultithreadedApplicationSourceCodeModel object
+        """
+        file_path = join(self.source_path_prefix, file_to_parse)
+        with purify(file_path) as pure_file_path:
+            ast = parse_file(pure_file_path)
+        return create_mascm(deque([ast]))